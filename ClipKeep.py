@@ -7,10 +7,18 @@ import re
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 import os
 import hashlib
 import shutil
+import io
+import queue
+import threading
+import time
+import copy
+import functools
+from collections import OrderedDict
+from concurrent.futures import Future
 
 # 确保配置目录存在
 config_dir = Path.home() / ".clipkeep"
@@ -28,21 +36,23 @@ logging.basicConfig(
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
-    QListWidget, QListWidgetItem, QTextEdit, QLabel,
+    QListView, QTextEdit, QLabel,
     QSplitter, QHBoxLayout, QPushButton, QCheckBox,
     QMessageBox, QLineEdit, QMenu, QSystemTrayIcon,
     QStyle, QDialog, QFormLayout, QSpinBox, QGroupBox,
-    QComboBox
+    QComboBox, QStyledItemDelegate
 )
 from PyQt6.QtGui import (
     QIcon, QAction, QPixmap, QImage, QKeySequence,
-    QShortcut, QWheelEvent, QDesktopServices, QPalette, QColor, QCursor, QDrag
+    QShortcut, QWheelEvent, QDesktopServices, QPalette, QColor, QCursor, QDrag,
+    QImageWriter, QImageReader, QPixmapCache
 )
 from PyQt6.QtCore import (
     Qt, QTimer, QByteArray, QBuffer, QSize, QUrl,
     QThreadPool, QRunnable, QObject, pyqtSignal, pyqtSlot,
     QPoint, QRect, QPropertyAnimation, QEasingCurve, QMimeData,
-    QSortFilterProxyModel, QRegularExpression
+    QSortFilterProxyModel, QRegularExpression, QAbstractListModel, QModelIndex,
+    QEvent
 )
 from PyQt6.QtNetwork import QLocalServer, QLocalSocket
 
@@ -54,6 +64,16 @@ except ImportError:
     PYNPUT_AVAILABLE = False
     logging.warning("pynput not available, global hotkey disabled")
 
+# 尝试导入 Pillow (libjpeg-turbo / zlib 编码更快)
+try:
+    from PIL import Image, features
+    PIL_AVAILABLE = True
+    PIL_WEBP_AVAILABLE = features.check("webp")
+except ImportError:
+    PIL_AVAILABLE = False
+    PIL_WEBP_AVAILABLE = False
+    logging.info("Pillow not available, using Qt image encoder")
+
 def resource_path(relative_path):
     """PyInstaller safe resource loading"""
     if hasattr(sys, '_MEIPASS'):
@@ -75,9 +95,24 @@ ROLE_CONTENT_HASH = Qt.ItemDataRole.UserRole + 4
 
 MAX_IMAGE_AREA_PIXELS = 4 * 1024 * 1024
 SAVE_DEBOUNCE_MS = 700
+SETTINGS_SAVE_DEBOUNCE_MS = 500
+GEOMETRY_SAVE_IDLE_MS = 5000  # 移动/缩放停止 5 秒后才保存窗口位置
+CLIPBOARD_DEBOUNCE_MS = 250
+SEARCH_DEBOUNCE_MS = 80
+SEARCH_PREFIX_CHARS = 512  # 搜索只匹配内容的前若干字符
 RESIZE_DEBOUNCE_MS = 150
+READ_POOL_THREADS = 4
+IMAGE_POOL_THREADS = 2
+DETAIL_LOAD_PRIORITY = 1  # 详情读取优先于缩略图等其它读取任务
 DEFAULT_MAX_HISTORY = 100
 THUMBNAIL_SIZE = 64
+THUMBNAIL_JPEG_QUALITY = 60  # 缩略图只按图标尺寸显示，低质量看不出差别
+THUMBNAIL_WEBP_QUALITY = 80
+PNG_FAST_COMPRESSION = 11  # Qt 将 0-100 映射到 zlib 0-9，11 即 zlib 级别 1
+THUMBNAIL_CACHE_SIZE = 256
+RECENT_HASH_CACHE_SIZE = 200
+PLAIN_TEXT_CACHE_SIZE = 512
+ICON_CACHE_SIZE = 200  # 列表中保留的已解码缩略图数量
 
 # Edge hide settings
 EDGE_HIDE_THRESHOLD = 5
@@ -87,11 +122,79 @@ EDGE_SNAP_DISTANCE = 25
 ANIMATION_DURATION = 250
 EDGE_HIDE_DELAY_MS = 1500  # 贴边后等待1.5秒再隐藏
 EDGE_SHOW_DELAY_MS = 300   # 光标靠近后等待0.3秒再显示
+EDGE_SETTLE_MS = 150       # 窗口停止移动后再检查贴边
+EDGE_HIDDEN_POLL_MS = 200  # 仅在隐藏时轮询光标位置
 
 # Temp cleanup settings
 TEMP_CLEANUP_DAYS = 1
 MIN_FREE_SPACE_MB = 50
 
+# SQLite tuning (WAL + relaxed fsync, applied to every connection)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA busy_timeout=5000",
+)
+WRITE_BATCH_MAX_MS = 50
+
+SCHEMA_VERSION = 2
+BLOB_DIR_NAME = "blobs"  # 图片原图文件目录，与数据库同级
+
+# HTML 转纯文本用的正则（模块加载时编译一次）
+HTML_SCRIPT_STYLE_RE = re.compile(r'<(script|style)[^>]*>.*?</\1>', re.DOTALL | re.IGNORECASE)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# SQL statements (shared constants so every call hits the connection's statement cache)
+# 相同内容再次复制时只刷新时间戳，不重复写入
+SQL_INSERT_TEXT = """
+    INSERT INTO records (type, content, timestamp, format, content_hash)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(content_hash) DO UPDATE SET timestamp = excluded.timestamp
+"""
+SQL_INSERT_IMAGE = """
+    INSERT INTO records (type, blob_path, timestamp, thumbnail, format, width, height, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(content_hash) DO UPDATE SET timestamp = excluded.timestamp
+"""
+# 历史列表的行格式 (id, type, content, timestamp, format, content_hash)，不含 BLOB
+# 纯文本只取预览/搜索用到的前缀；文件列表要统计行数、HTML 要去标签，仍取全文
+SQL_LIST_CONTENT = f"""
+    CASE WHEN format IN ('file', 'html') THEN content
+         ELSE substr(content, 1, {SEARCH_PREFIX_CHARS}) END
+"""
+SQL_LOAD_ALL = f"""
+    SELECT id, type, {SQL_LIST_CONTENT}, timestamp, format, content_hash
+    FROM records ORDER BY timestamp DESC LIMIT ?
+"""
+SQL_LIST_ROW_FOR_HASH = f"""
+    SELECT id, type, {SQL_LIST_CONTENT}, timestamp, format, content_hash
+    FROM records WHERE content_hash = ?
+"""
+SQL_TOUCH = "UPDATE records SET timestamp = ? WHERE content_hash = ?"
+SQL_UPDATE_TEXT = "UPDATE records SET content = ?, content_hash = ? WHERE id = ?"
+SQL_DELETE_RECORD = "DELETE FROM records WHERE id = ?"
+SQL_DELETE_ALL = "DELETE FROM records"
+SQL_TRIM_CUTOFF = "SELECT timestamp FROM records ORDER BY timestamp DESC LIMIT 1 OFFSET ?"
+SQL_TRIM = "DELETE FROM records WHERE timestamp < ?"
+SQL_BLOB_PATH_BY_ID = "SELECT blob_path FROM records WHERE id = ? AND blob_path IS NOT NULL"
+SQL_BLOB_PATHS_ALL = "SELECT blob_path FROM records WHERE blob_path IS NOT NULL"
+SQL_BLOB_PATHS_BEFORE = "SELECT blob_path FROM records WHERE timestamp < ? AND blob_path IS NOT NULL"
+SQL_FIND_HASH = "SELECT 1 FROM records WHERE content_hash = ?"
+SQL_ID_FOR_HASH = "SELECT id FROM records WHERE content_hash = ?"
+SQL_RECENT_HASHES = """
+    SELECT content_hash FROM records WHERE content_hash IS NOT NULL
+    ORDER BY timestamp DESC LIMIT ?
+"""
+SQL_THUMBNAIL = "SELECT thumbnail FROM records WHERE id = ?"
+SQL_DETAIL = """
+    SELECT id, type, content, content_blob, timestamp, thumbnail, format, content_hash, blob_path
+    FROM records WHERE id = ?
+"""
+
 # -----------------------
 # Multi-Language Support
 # -----------------------
@@ -208,9 +311,17 @@ TRANSLATIONS = {
     }
 }
 
+# 扁平化的 (语言, 键) -> 文本 表，tr() 只需一次字典查找
+_TR = {(lang, sys.intern(key)): text
+       for lang, strings in TRANSLATIONS.items() for key, text in strings.items()}
+
 def tr(key: str, lang: str = "zh_CN") -> str:
     """Translation helper"""
-    return TRANSLATIONS.get(lang, TRANSLATIONS["zh_CN"]).get(key, key)
+    text = _TR.get((lang, key))
+    if text is None:
+        # 未知语言回退到中文，未知键原样返回
+        text = key if lang in TRANSLATIONS else _TR.get(("zh_CN", key), key)
+    return text
 
 # WinUI 3.0 Stylesheet
 WINUI_STYLESHEET = """
@@ -247,24 +358,24 @@ QPushButton:pressed {
     background-color: #f0f0f0;
     color: #666;
 }
-QListWidget {
+QListView {
     background-color: white;
     border: 1px solid #e5e5e5;
     border-radius: 8px;
     outline: none;
 }
-QListWidget::item {
+QListView::item {
     padding: 12px;
     border-bottom: 1px solid #f9f9f9;
     border-radius: 4px;
     margin: 2px 4px;
 }
-QListWidget::item:selected {
+QListView::item:selected {
     background-color: #e0eaff;
     color: #000;
     border: none;
 }
-QListWidget::item:hover:!selected {
+QListView::item:hover:!selected {
     background-color: #f3f3f3;
 }
 QTextEdit {
@@ -317,25 +428,25 @@ QPushButton:pressed {
     background-color: #2b2b2b;
     color: #ccc;
 }
-QListWidget {
+QListView {
     background-color: #151515;
     border: 1px solid #2a2a2a;
     border-radius: 8px;
     outline: none;
 }
-QListWidget::item {
+QListView::item {
     padding: 12px;
     border-bottom: 1px solid #151515;
     border-radius: 4px;
     margin: 2px 4px;
     color: #e8e8e8;
 }
-QListWidget::item:selected {
+QListView::item:selected {
     background-color: #005090;
     color: #ffffff;
     border: none;
 }
-QListWidget::item:hover:!selected {
+QListView::item:hover:!selected {
     background-color: #232323;
 }
 QTextEdit {
@@ -356,6 +467,46 @@ QLabel#DetailPlaceholder {
 # -----------------------
 # Data Model
 # -----------------------
+def apply_sqlite_pragmas(conn: sqlite3.Connection):
+    """Apply WAL mode and write-performance PRAGMAs to a connection"""
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+
+def blob_dir_for(db_path: Path) -> Path:
+    """Directory holding image files referenced by records.blob_path"""
+    return db_path.parent / BLOB_DIR_NAME
+
+def content_digest(data: bytes) -> str:
+    """Content fingerprint used for de-duplication"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def image_digest(image: QImage) -> str:
+    """Fingerprint the raw pixels of an image (no encoding needed)"""
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{image.width()}x{image.height()}:{image.format().value}:".encode())
+    h.update(bits)
+    return h.hexdigest()
+
+@functools.lru_cache(maxsize=PLAIN_TEXT_CACHE_SIZE)
+def strip_html_tags(html: str) -> str:
+    """Plain text of an HTML record (memoized; list rebuilds re-strip the same bodies)"""
+    try:
+        html = HTML_SCRIPT_STYLE_RE.sub('', html)
+        html = HTML_TAG_RE.sub('', html)
+        if '&' in html:  # 没有实体时省去四次整串扫描
+            html = html.replace('&nbsp;', ' ').replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
+        # str.split() 按空白切分，与 \s+ 合并空白等价但更快
+        return ' '.join(html.split())
+    except (TypeError, re.error):
+        return html[:100]
+
+def file_urls(content: str) -> List[QUrl]:
+    """Local file URLs for a newline-separated "file" record"""
+    return [QUrl.fromLocalFile(p) for p in (line.strip() for line in content.splitlines()) if p]
+
+
 class ClipboardRecord:
     """Represents a single clipboard record."""
     def __init__(self, record_id: int, record_type: str, content: any,
@@ -368,18 +519,241 @@ class ClipboardRecord:
         self.thumbnail = thumbnail
         self.format = fmt
         self.content_hash = content_hash
+        self.image_mips: List[QImage] = []  # 详情视图用的预缩放层级
+        self.encoded_data: Optional[bytes] = None  # 图片的原始编码字节，打开时直接写出
+
+
+
+class WriterSignals(QObject):
+    completed = pyqtSignal(str, object)
+    touch_missed = pyqtSignal(str)  # 要刷新的记录已不存在（被裁剪或写入失败）
+    failed = pyqtSignal(str, object)  # 写入失败的操作及其参数 (op, kwargs)
+
+
+class DBWriter(threading.Thread):
+    """Background thread owning the single writable connection.
+
+    Operations are queued with enqueue() and committed in batches, one
+    transaction per batch, so the GUI thread never waits on an fsync.
+    """
+    def __init__(self, db_path: Path):
+        super().__init__(name="ClipKeepDBWriter", daemon=True)
+        self.db_path = db_path
+        self.blob_dir = blob_dir_for(db_path)
+        self.queue = queue.Queue()
+        self.signals = WriterSignals()
+        self._unlinks: List[str] = []  # 事务提交后再删除的图片文件
+        self._written: List[str] = []  # 本批次新写入的图片文件，回滚时删除
+        self._pending_trim: Optional[int] = None  # 每个批次末尾只裁剪一次
+
+    def enqueue(self, op: str, **kwargs) -> Future:
+        future = Future()
+        self.queue.put((op, kwargs, future))
+        return future
+
+    def stop(self, timeout: float = 5.0):
+        self.queue.put(None)
+        self.join(timeout)
+
+    def run(self):
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        apply_sqlite_pragmas(conn)
+        cursor = conn.cursor()
+        running = True
+
+        while running:
+            task = self.queue.get()
+            if task is None:
+                break
+
+            # 在时间预算内取空队列，合并为一个事务
+            batch = [task]
+            deadline = time.monotonic() + WRITE_BATCH_MAX_MS / 1000
+            while time.monotonic() < deadline:
+                try:
+                    task = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if task is None:
+                    running = False
+                    break
+                batch.append(task)
+
+            self._run_batch(cursor, batch)
+
+        # 退出前把 WAL 合并回主库并截断，避免遗留大文件
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            logging.warning(f"WAL checkpoint failed: {e}")
+        conn.close()
+
+    def _run_batch(self, cursor, batch):
+        outcomes = []
+        self._unlinks = []
+        self._written = []
+        self._pending_trim = None
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for op, kwargs, future in batch:
+                cursor.execute("SAVEPOINT op")
+                unlinks_before = list(self._unlinks)
+                written_mark = len(self._written)
+                try:
+                    result = getattr(self, f"_op_{op}")(cursor, **kwargs)
+                    cursor.execute("RELEASE op")
+                    outcomes.append((op, kwargs, future, result, None))
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO op")
+                    cursor.execute("RELEASE op")
+                    self._unlinks = unlinks_before
+                    self._remove_blobs(self._written[written_mark:])
+                    del self._written[written_mark:]
+                    logging.error(f"DB write '{op}' error: {e}", exc_info=True)
+                    outcomes.append((op, kwargs, future, None, e))
+            if self._pending_trim is not None:
+                self._trim_in_savepoint(cursor, self._pending_trim)
+            cursor.execute("COMMIT")
+        except Exception as e:
+            logging.error(f"DB write batch error: {e}", exc_info=True)
+            try:
+                cursor.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            # 整批回滚后，新写入的图片文件已无记录引用
+            self._remove_blobs(self._written)
+            for op, kwargs, future in batch:
+                future.set_exception(e)
+                self.signals.failed.emit(op, kwargs)
+            return
+
+        # 行已删除且事务已提交，此时再删除对应的图片文件
+        self._remove_blobs(self._unlinks)
+
+        for op, kwargs, future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+                self.signals.failed.emit(op, kwargs)
+            else:
+                future.set_result(result)
+                self.signals.completed.emit(op, result)
+
+    def _remove_blobs(self, names: List[str]):
+        for name in names:
+            try:
+                (self.blob_dir / name).unlink(missing_ok=True)
+            except OSError as e:
+                logging.warning(f"Remove image file error: {e}")
+
+    def _op_add_text(self, cursor, text: str, record_format: str,
+                     content_hash: Optional[str] = None, trim_to: Optional[int] = None) -> tuple:
+        if content_hash is None:
+            content_hash = content_digest(text.encode())
+        cursor.execute(SQL_INSERT_TEXT, ("text", text, time.time(), record_format, content_hash))
+        row = cursor.execute(SQL_LIST_ROW_FOR_HASH, (content_hash,)).fetchone()
+        self._request_trim(trim_to)
+        return row
+
+    def _op_add_image(self, cursor, image_data: bytes, thumbnail: bytes, fmt: str,
+                      width: int, height: int, content_hash: str,
+                      trim_to: Optional[int] = None) -> tuple:
+        # 原图写入独立文件，数据库只保存文件名；按哈希命名，重复内容复用同一文件
+        blob_name = f"{content_hash}.{fmt.lower()}"
+        blob_file = self.blob_dir / blob_name
+        while blob_name in self._unlinks:  # 同一批次中先删除后又复制
+            self._unlinks.remove(blob_name)
+        if not blob_file.exists():
+            tmp_file = blob_file.with_suffix(".tmp")
+            tmp_file.write_bytes(image_data)
+            os.replace(tmp_file, blob_file)
+            self._written.append(blob_name)
+        cursor.execute(SQL_INSERT_IMAGE, (
+            "image",
+            blob_name,
+            time.time(),
+            thumbnail,
+            fmt,
+            width,
+            height,
+            content_hash
+        ))
+        row = cursor.execute(SQL_LIST_ROW_FOR_HASH, (content_hash,)).fetchone()
+        self._request_trim(trim_to)
+        return row
+
+    def _trim_in_savepoint(self, cursor, max_count: int):
+        cursor.execute("SAVEPOINT op")
+        unlink_mark = len(self._unlinks)
+        # 裁剪的是最旧的记录，原图文件本身也只是 unlink，不必逐页清零
+        secure_delete = cursor.execute("PRAGMA secure_delete").fetchone()[0]
+        cursor.execute("PRAGMA secure_delete=OFF")
+        try:
+            self._op_trim(cursor, max_count)
+            cursor.execute("RELEASE op")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO op")
+            cursor.execute("RELEASE op")
+            del self._unlinks[unlink_mark:]
+            logging.error(f"DB trim error: {e}", exc_info=True)
+        finally:
+            cursor.execute(f"PRAGMA secure_delete={secure_delete}")
+
+    def _request_trim(self, trim_to: Optional[int]):
+        if trim_to is not None:
+            self._pending_trim = trim_to if self._pending_trim is None else min(self._pending_trim, trim_to)
+
+    def _op_touch(self, cursor, content_hash: str) -> Optional[tuple]:
+        cursor.execute(SQL_TOUCH, (time.time(), content_hash))
+        if cursor.rowcount == 0:
+            self.signals.touch_missed.emit(content_hash)
+            return None
+        return cursor.execute(SQL_LIST_ROW_FOR_HASH, (content_hash,)).fetchone()
+
+    def _op_update_text_batch(self, cursor, edits: dict) -> dict:
+        updated = {}
+        for record_id, text in edits.items():
+            # 内容变了哈希也要跟着变，否则再次复制原文只会刷新这条已编辑的记录
+            content_hash = content_digest(text.encode())
+            row = cursor.execute(SQL_ID_FOR_HASH, (content_hash,)).fetchone()
+            merged = row[0] if row is not None and row[0] != record_id else None
+            if merged is not None:
+                # 编辑后与另一条记录相同：合并为正在编辑的这一条
+                self._op_delete(cursor, merged)
+            cursor.execute(SQL_UPDATE_TEXT, (text, content_hash, record_id))
+            updated[record_id] = (text, content_hash, merged)
+        return updated
+
+    def _op_delete(self, cursor, record_id: int):
+        self._unlinks.extend(r[0] for r in cursor.execute(SQL_BLOB_PATH_BY_ID, (record_id,)).fetchall())
+        cursor.execute(SQL_DELETE_RECORD, (record_id,))
+
+    def _op_clear(self, cursor):
+        self._unlinks.extend(r[0] for r in cursor.execute(SQL_BLOB_PATHS_ALL).fetchall())
+        cursor.execute(SQL_DELETE_ALL)
+
+    def _op_trim(self, cursor, max_count: int):
+        # 通过 idx_timestamp 找到第 max_count 条的时间戳，再按范围删除
+        row = cursor.execute(SQL_TRIM_CUTOFF, (max_count - 1,)).fetchone()
+        if row is not None:
+            self._unlinks.extend(r[0] for r in cursor.execute(SQL_BLOB_PATHS_BEFORE, (row[0],)).fetchall())
+            cursor.execute(SQL_TRIM, (row[0],))
 
 
 class ClipboardDatabase:
-    """Synchronous Database Manager."""
+    """Database Manager. Reads run inline, writes go through DBWriter."""
     def __init__(self, db_path: Path):
         self.db_path = db_path
         self.conn = None
+        blob_dir_for(db_path).mkdir(exist_ok=True)
         self._init_database()
+        self.writer = DBWriter(db_path)
+        self.signals = self.writer.signals
+        self.writer.start()
 
     def _init_database(self):
         try:
-            self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self.conn = sqlite3.connect(str(self.db_path))
+            apply_sqlite_pragmas(self.conn)
             cursor = self.conn.cursor()
 
             cursor.execute("""
@@ -393,20 +767,57 @@ class ClipboardDatabase:
                     format TEXT,
                     width INTEGER,
                     height INTEGER,
-                    content_hash TEXT
+                    content_hash TEXT,
+                    blob_path TEXT
                 )
             """)
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_timestamp ON records(timestamp DESC)
             """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_hash ON records(content_hash)
-            """)
+            self._migrate(cursor)
             self.conn.commit()
+            self._cursor = cursor
         except Exception as e:
             logging.error(f"Database init error: {e}", exc_info=True)
             raise
 
+    def _migrate(self, cursor):
+        """Upgrade older databases, tracked via PRAGMA user_version"""
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        if version < 1:
+            # content_hash 改为唯一索引，先合并旧的重复记录（保留最新一条）
+            cursor.execute("DROP INDEX IF EXISTS idx_hash")
+            # 旧版文本记录使用 MD5，按当前算法重新计算，否则再次复制时无法去重。
+            # 哈希按当前内容计算：编辑后与其他记录相同的旧行也会在下面被合并，只保留最新一条
+            rows = cursor.execute(
+                "SELECT id, content FROM records WHERE type = 'text' AND content IS NOT NULL"
+            ).fetchall()
+            cursor.executemany("UPDATE records SET content_hash = ? WHERE id = ?",
+                               [(content_digest(content.encode()), rec_id) for rec_id, content in rows])
+            cursor.execute("""
+                DELETE FROM records WHERE content_hash IS NOT NULL AND id NOT IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY content_hash ORDER BY timestamp DESC
+                        ) AS rn FROM records WHERE content_hash IS NOT NULL
+                    ) WHERE rn = 1
+                )
+            """)
+            cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_content_hash ON records(content_hash)
+            """)
+
+        if version < 2:
+            # 新图片存为文件；旧记录仍从 content_blob 读取
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(records)")}
+            if "blob_path" not in columns:
+                cursor.execute("ALTER TABLE records ADD COLUMN blob_path TEXT")
+
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
     def test_write(self) -> bool:
         """Test database write capability"""
         conn = None
@@ -427,107 +838,97 @@ class ClipboardDatabase:
             if conn:
                 conn.close()
 
-    def add_text_record(self, text: str, record_format: str = "plain") -> int:
-        try:
-            content_hash = hashlib.md5(text.encode()).hexdigest()
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT INTO records (type, content, timestamp, format, content_hash)
-                VALUES (?, ?, ?, ?, ?)
-            """, ("text", text, datetime.now().timestamp(), record_format, content_hash))
-            self.conn.commit()
-            return cursor.lastrowid
-        except Exception as e:
-            print(f"Add text record error: {e}")
-            return 0
+    def add_text_record(self, text: str, record_format: str = "plain",
+                        content_hash: Optional[str] = None, trim_to: Optional[int] = None) -> Future:
+        """Insert a text record; resolves to its history list row.
+
+        trim_to trims history in the same transaction.
+        """
+        return self.writer.enqueue("add_text", text=text, record_format=record_format,
+                                   content_hash=content_hash, trim_to=trim_to)
+
+    def add_image_record(self, image_data: bytes, thumbnail: bytes, fmt: str,
+                        width: int, height: int, content_hash: str,
+                        trim_to: Optional[int] = None) -> Future:
+        return self.writer.enqueue(
+            "add_image", image_data=image_data, thumbnail=thumbnail, fmt=fmt,
+            width=width, height=height, content_hash=content_hash, trim_to=trim_to
+        )
 
-    def add_image_record(self, image_data: bytes, thumbnail: bytes, fmt: str, 
-                        width: int, height: int, content_hash: str) -> int:
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT INTO records (type, content_blob, timestamp, thumbnail, format, width, height, content_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                "image",
-                image_data,
-                datetime.now().timestamp(),
-                thumbnail,
-                fmt,
-                width,
-                height,
-                content_hash
-            ))
-            self.conn.commit()
-            return cursor.lastrowid
-        except Exception as e:
-            print(f"Add image record error: {e}")
-            return 0
+    def touch_record(self, content_hash: str) -> Future:
+        """Move an existing record to the top by refreshing its timestamp"""
+        return self.writer.enqueue("touch", content_hash=content_hash)
 
     def check_duplicate_hash(self, content_hash: str) -> bool:
-        """Check if content hash exists in recent records"""
+        """Check if content hash already exists"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT id FROM records 
-                WHERE content_hash = ? 
-                ORDER BY timestamp DESC LIMIT 1
-            """, (content_hash,))
-            return cursor.fetchone() is not None
-        except:
+            self._cursor.execute(SQL_FIND_HASH, (content_hash,))
+            return self._cursor.fetchone() is not None
+        except sqlite3.Error as e:
+            logging.error(f"Duplicate check error: {e}")
             return False
 
-    def update_text_content(self, record_id: int, new_text: str):
+    def recent_hashes(self, limit: int) -> List[str]:
+        """Content hashes of the newest records, newest first"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("UPDATE records SET content = ? WHERE id = ?", (new_text, record_id))
-            self.conn.commit()
-        except Exception as e:
-            print(f"Update text error: {e}")
+            self._cursor.execute(SQL_RECENT_HASHES, (limit,))
+            return [row[0] for row in self._cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error(f"Load recent hashes error: {e}")
+            return []
 
-    def delete_record(self, record_id: int):
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM records WHERE id = ?", (record_id,))
-            self.conn.commit()
-        except Exception as e:
-            print(f"Delete record error: {e}")
+    def update_text_content_batch(self, edits: dict) -> Future:
+        """Apply {record_id: new_text} edits in a single transaction.
 
-    def clear_all(self):
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM records")
-            self.conn.commit()
-        except Exception as e:
-            print(f"Clear all error: {e}")
+        Resolves to {record_id: (text, content_hash, merged_id)}; merged_id is
+        the record that became a duplicate of the edit and was removed.
+        """
+        return self.writer.enqueue("update_text_batch", edits=edits)
 
-    def get_count(self) -> int:
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM records")
-            return cursor.fetchone()[0]
-        except:
-            return 0
+    def delete_record(self, record_id: int) -> Future:
+        return self.writer.enqueue("delete", record_id=record_id)
 
-    def trim_to_limit(self, max_count: int):
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                DELETE FROM records WHERE id NOT IN (
-                    SELECT id FROM records ORDER BY timestamp DESC LIMIT ?
-                )
-            """, (max_count,))
-            self.conn.commit()
-        except Exception as e:
-            print(f"Trim error: {e}")
+    def clear_all(self) -> Future:
+        return self.writer.enqueue("clear")
+
+    def trim_to_limit(self, max_count: int) -> Future:
+        return self.writer.enqueue("trim", max_count=max_count)
 
     def close(self):
+        if self.writer.is_alive():
+            self.writer.stop()
+        close_reader_connections(self.db_path)
         if self.conn:
             self.conn.close()
 
 # -----------------------
 # Async Workers
 # -----------------------
+# QRunnable.run 每次都在临时的 Python 线程状态下执行，threading.local 无法跨次保留，
+# 因此按线程 ID 保存只读连接
+_reader_conns: Dict[Tuple[int, Path], sqlite3.Connection] = {}
+_reader_lock = threading.Lock()
+
+def get_reader_connection(db_path: Path) -> sqlite3.Connection:
+    """Return the calling pool thread's persistent read-only connection"""
+    key = (threading.get_ident(), db_path)
+    with _reader_lock:
+        conn = _reader_conns.get(key)
+    if conn is None:
+        conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        apply_sqlite_pragmas(conn)
+        with _reader_lock:
+            _reader_conns[key] = conn
+    return conn
+
+def close_reader_connections(db_path: Path):
+    """Close every pooled read-only connection to db_path"""
+    with _reader_lock:
+        keys = [key for key in _reader_conns if key[1] == db_path]
+        conns = [_reader_conns.pop(key) for key in keys]
+    for conn in conns:
+        conn.close()
+
 class WorkerSignals(QObject):
     finished = pyqtSignal()
     error = pyqtSignal(tuple)
@@ -545,42 +946,56 @@ class DBWorker(QRunnable):
     @pyqtSlot()
     def run(self):
         try:
-            conn = sqlite3.connect(str(self.db_path))
+            conn = get_reader_connection(self.db_path)
             cursor = conn.cursor()
             output = None
 
             if self.mode == "load_all":
                 limit = self.kwargs.get("limit", 100)
-                cursor.execute("""
-                    SELECT id, type, content, content_blob, timestamp, thumbnail, format, content_hash
-                    FROM records ORDER BY timestamp DESC LIMIT ?
-                """, (limit,))
-                rows = cursor.fetchall()
-                records = []
-                for row in rows:
-                    rec_id, rec_type, txt, blob, ts, thumb, fmt, c_hash = row
-                    content = txt if rec_type == "text" else None
-                    records.append(ClipboardRecord(rec_id, rec_type, content, ts, thumb, fmt, c_hash or ""))
-                output = records
+                # 不读取图片与缩略图 BLOB，缩略图在行可见时按需加载
+                cursor.execute(SQL_LOAD_ALL, (limit,))
+                # 直接返回行元组，由 ClipListModel 按列读取
+                output = cursor.fetchall()
+
+            elif self.mode == "get_thumb":
+                rec_id = self.kwargs.get("record_id")
+                cursor.execute(SQL_THUMBNAIL, (rec_id,))
+                row = cursor.fetchone()
+                image = QImage.fromData(row[0]) if row and row[0] else None
+                # 缩放到列表图标的实际像素尺寸，绘制时无需再缩放
+                icon_px = self.kwargs.get("icon_px")
+                if image is not None and icon_px and max(image.width(), image.height()) > icon_px:
+                    dpr = self.kwargs.get("dpr", 1.0)
+                    image = image.scaled(icon_px, icon_px, Qt.AspectRatioMode.KeepAspectRatio,
+                                         Qt.TransformationMode.SmoothTransformation)
+                    image.setDevicePixelRatio(dpr)
+                output = (rec_id, image)
 
             elif self.mode == "get_detail":
                 rec_id = self.kwargs.get("record_id")
-                cursor.execute("""
-                    SELECT id, type, content, content_blob, timestamp, thumbnail, format, content_hash
-                    FROM records WHERE id = ?
-                """, (rec_id,))
+                cursor.execute(SQL_DETAIL, (rec_id,))
                 row = cursor.fetchone()
                 if row:
-                    rec_id, rec_type, txt, blob, ts, thumb, fmt, c_hash = row
+                    rec_id, rec_type, txt, blob, ts, thumb, fmt, c_hash, blob_path = row
                     if rec_type == "text":
                         content = txt
                     else:
+                        data = blob or b""
+                        if blob_path:
+                            try:
+                                data = (blob_dir_for(self.db_path) / blob_path).read_bytes()
+                            except OSError:
+                                data = b""
                         image = QImage()
-                        image.loadFromData(blob)
+                        image.loadFromData(data)
                         content = image
                     output = ClipboardRecord(rec_id, rec_type, content, ts, thumb, fmt, c_hash or "")
+                    if rec_type == "image" and data:
+                        output.encoded_data = data
+                    # 解码之外，缩放层级也在工作线程完成
+                    if rec_type == "image" and self.kwargs.get("with_mips"):
+                        output.image_mips = build_image_mips(content)
 
-            conn.close()
             self.signals.result.emit(output)
         except Exception as e:
             print(f"DBWorker error: {e}")
@@ -589,14 +1004,96 @@ class DBWorker(QRunnable):
         finally:
             self.signals.finished.emit()
 
+def build_image_mips(image: QImage) -> List[QImage]:
+    """Return the image plus half and quarter size smooth-scaled copies"""
+    mips = [image]
+    for divisor in (2, 4):
+        w, h = image.width() // divisor, image.height() // divisor
+        if w < THUMBNAIL_SIZE or h < THUMBNAIL_SIZE:
+            break
+        mips.append(mips[-1].scaled(
+            w, h, Qt.AspectRatioMode.IgnoreAspectRatio,
+            Qt.TransformationMode.SmoothTransformation))
+    return mips
+
+def downscale_image(image: QImage, width: int, height: int) -> QImage:
+    """Fit image into width x height: cheap halving passes, then one smooth pass"""
+    if image.width() <= width and image.height() <= height:
+        return image  # 已经足够小，不放大也不重新采样
+    target = image.size().scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio)
+    # 先用快速缩放减半到目标的 2~4 倍，最后一次平滑缩放保证质量
+    while image.width() >= target.width() * 4 and image.height() >= target.height() * 4:
+        image = image.scaled(image.width() // 2, image.height() // 2,
+                             Qt.AspectRatioMode.IgnoreAspectRatio,
+                             Qt.TransformationMode.FastTransformation)
+    return image.scaled(target, Qt.AspectRatioMode.IgnoreAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation)
+
+def thumbnail_alpha_format() -> str:
+    """WebP for transparent thumbnails when Qt can decode it, else PNG"""
+    # WebP 由 qtimageformats 插件提供，缺少插件时无法解码，回退 PNG
+    if b"webp" in (bytes(f) for f in QImageReader.supportedImageFormats()):
+        return "WEBP"
+    return "PNG"
+
+THUMBNAIL_ALPHA_FORMAT = thumbnail_alpha_format()
+
+def encode_image(image: QImage, fmt: str, quality: int = -1) -> bytes:
+    """Encode a QImage as PNG/JPEG/WEBP bytes, through Pillow when available"""
+    if PIL_AVAILABLE and (fmt != "WEBP" or PIL_WEBP_AVAILABLE):
+        if image.hasAlphaChannel():
+            src = image.convertToFormat(QImage.Format.Format_RGBA8888)
+            mode, raw_mode = "RGBA", "RGBA"
+        else:
+            # 直接转为 24 位 RGB，Pillow 可零拷贝包装，无需再 convert("RGB")
+            src = image.convertToFormat(QImage.Format.Format_RGB888)
+            mode, raw_mode = "RGB", "RGB"
+        bits = src.constBits()
+        bits.setsize(src.sizeInBytes())
+        pil_img = Image.frombuffer(mode, (src.width(), src.height()), bits, "raw",
+                                   raw_mode, src.bytesPerLine(), 1)
+        out = io.BytesIO()
+        if fmt == "JPEG":
+            if pil_img.mode != "RGB":
+                pil_img = pil_img.convert("RGB")
+            pil_img.save(out, "JPEG", quality=quality if quality >= 0 else 90,
+                         optimize=False, progressive=False)
+        elif fmt == "WEBP":
+            pil_img.save(out, "WEBP", quality=quality if quality >= 0 else 80, method=0)
+        else:
+            pil_img.save(out, "PNG", optimize=False, compress_level=1)
+        return out.getvalue()
+
+    array = QByteArray()
+    buffer = QBuffer(array)
+    buffer.open(QBuffer.OpenModeFlag.WriteOnly)
+    writer = QImageWriter(buffer, fmt.encode())
+    if fmt == "JPEG":
+        writer.setQuality(quality)
+        writer.setOptimizedWrite(False)
+        writer.setProgressiveScanWrite(False)
+    elif fmt == "WEBP":
+        writer.setQuality(quality)
+    else:
+        writer.setCompression(PNG_FAST_COMPRESSION)
+    writer.write(image)
+    buffer.close()
+    return array.data()
+
 class ImageProcessWorker(QRunnable):
     """Worker for processing and saving images"""
-    def __init__(self, image: QImage, db_path: Path, max_area: int, save_original: bool):
+    def __init__(self, image: QImage, db: ClipboardDatabase, max_area: int, save_original: bool,
+                 max_history: int, source_hash: str, cached_thumbnail: Optional[bytes] = None,
+                 encoded_source: Optional[Tuple[bytes, str]] = None):
         super().__init__()
         self.image = image
-        self.db_path = db_path
+        self.db = db
         self.max_area = max_area
         self.save_original = save_original
+        self.max_history = max_history
+        self.source_hash = source_hash
+        self.cached_thumbnail = cached_thumbnail
+        self.encoded_source = encoded_source  # 剪贴板提供的原始 (字节, 格式)
         self.signals = WorkerSignals()
 
     @pyqtSlot()
@@ -611,66 +1108,49 @@ class ImageProcessWorker(QRunnable):
                     scale_factor = (self.max_area / area) ** 0.5
                     new_width = int(self.image.width() * scale_factor)
                     new_height = int(self.image.height() * scale_factor)
-                    persist_image = self.image.scaled(
-                        new_width, new_height,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
+                    persist_image = downscale_image(self.image, new_width, new_height)
 
-            # Generate thumbnail
-            thumb = persist_image.scaled(
-                THUMBNAIL_SIZE, THUMBNAIL_SIZE,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            
-            thumb_array = QByteArray()
-            thumb_buffer = QBuffer(thumb_array)
-            thumb_buffer.open(QBuffer.OpenModeFlag.WriteOnly)
-            thumb.save(thumb_buffer, "PNG")
-            thumb_buffer.close()
+            # 小图（图标、表情等）本身即可作为缩略图，复用原图编码结果
+            is_tiny = (persist_image.width() <= THUMBNAIL_SIZE
+                       and persist_image.height() <= THUMBNAIL_SIZE)
+
+            # Generate thumbnail (skipped when the cache already has it)
+            thumb_bytes = self.cached_thumbnail
+            if thumb_bytes is None and not is_tiny:
+                thumb = downscale_image(persist_image, THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+
+                # JPEG 编码远快于 PNG；有透明通道时用 WebP（比 PNG 小约一半）
+                if thumb.hasAlphaChannel():
+                    thumb_bytes = encode_image(thumb, THUMBNAIL_ALPHA_FORMAT, THUMBNAIL_WEBP_QUALITY)
+                else:
+                    thumb_bytes = encode_image(thumb, "JPEG", THUMBNAIL_JPEG_QUALITY)
 
             # Save full image
             has_alpha = persist_image.hasAlphaChannel()
             fmt = "PNG" if has_alpha else "JPEG"
             
-            img_array = QByteArray()
-            img_buffer = QBuffer(img_array)
-            img_buffer.open(QBuffer.OpenModeFlag.WriteOnly)
             quality = -1 if fmt == "PNG" else 90
-            persist_image.save(img_buffer, fmt, quality)
-            img_buffer.close()
-
-            # Calculate hash
-            content_hash = hashlib.md5(img_array.data()).hexdigest()
-
-            # Save to database
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO records (type, content_blob, timestamp, thumbnail, format, width, height, content_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                "image",
-                img_array.data(),
-                datetime.now().timestamp(),
-                thumb_array.data(),
+            if (persist_image is self.image and self.encoded_source is not None
+                    and self.encoded_source[1] == fmt):
+                # 未缩放且来源已是同一格式，直接保存原始字节，省去重新编码
+                img_bytes = self.encoded_source[0]
+            else:
+                img_bytes = encode_image(persist_image, fmt, quality)
+            if thumb_bytes is None:
+                thumb_bytes = img_bytes
+
+            # Save to database (queued on the writer thread)
+            self.db.add_image_record(
+                img_bytes,
+                thumb_bytes,
                 fmt,
                 persist_image.width(),
                 persist_image.height(),
-                content_hash
-            ))
-            conn.commit()
-            record_id = cursor.lastrowid
-            conn.close()
-
-            # Clean up
-            del persist_image
-            del thumb
-            del img_array
-            del thumb_array
-            
-            self.signals.result.emit(content_hash)
+                self.source_hash,
+                trim_to=self.max_history
+            )
+
+            self.signals.result.emit((self.source_hash, thumb_bytes))
         except Exception as e:
             print(f"Image process error: {e}")
             traceback.print_exc()
@@ -678,6 +1158,40 @@ class ImageProcessWorker(QRunnable):
         finally:
             self.signals.finished.emit()
 
+class SettingsFileWriter:
+    """Atomic writes of settings.json; an older snapshot never replaces a newer one"""
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._written_seq = 0  # 最近写入的快照序号
+
+    def write(self, data: dict, seq: int):
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        # 先写临时文件再替换，避免写到一半时退出导致配置损坏
+        with self._lock:
+            # 较早提交的任务晚于新任务执行时，不能覆盖较新的配置
+            if seq < self._written_seq:
+                return
+            self._written_seq = seq
+            tmp_file = self.path.with_suffix(".tmp")
+            tmp_file.write_bytes(payload)
+            os.replace(tmp_file, self.path)
+
+class SettingsSaveWorker(QRunnable):
+    """Worker for writing settings.json off the UI thread"""
+    def __init__(self, writer: SettingsFileWriter, data: dict, seq: int):
+        super().__init__()
+        self.writer = writer
+        self.data = data
+        self.seq = seq
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            self.writer.write(self.data, self.seq)
+        except Exception as e:
+            logging.error(f"Error saving settings: {e}", exc_info=True)
+
 class SelfCheckWorker(QRunnable):
     """Worker for self-check on startup"""
     def __init__(self, db_path: Path, temp_dir: Path):
@@ -765,15 +1279,16 @@ class TempFileManager:
             if not self.base_dir.exists():
                 return
             
-            cutoff_time = datetime.now() - timedelta(days=TEMP_CLEANUP_DAYS)
-            
-            for item in self.base_dir.iterdir():
-                if item.is_dir() and item.name.startswith("session_"):
+            cutoff_ts = (datetime.now() - timedelta(days=TEMP_CLEANUP_DAYS)).timestamp()
+
+            # scandir 的 DirEntry 自带类型信息，先按名称过滤再 stat
+            with os.scandir(self.base_dir) as entries:
+                for entry in entries:
+                    if not entry.name.startswith("session_"):
+                        continue
                     try:
-                        # Check modification time
-                        mtime = datetime.fromtimestamp(item.stat().st_mtime)
-                        if mtime < cutoff_time:
-                            shutil.rmtree(item, ignore_errors=True)
+                        if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff_ts:
+                            shutil.rmtree(entry.path, ignore_errors=True)
                     except (PermissionError, OSError):
                         # 文件被占用时跳过
                         continue
@@ -789,7 +1304,158 @@ class TempFileManager:
 # -----------------------
 # Custom Widgets
 # -----------------------
-class DraggableListWidget(QListWidget):
+def set_style_if_changed(widget: QWidget, stylesheet: str):
+    """setStyleSheet re-polishes the widget even for identical input"""
+    if widget.styleSheet() != stylesheet:
+        widget.setStyleSheet(stylesheet)
+
+class ClipListModel(QAbstractListModel):
+    """History rows as raw load_all tuples (id, type, content, timestamp, format, content_hash)"""
+    ROLE_COLUMNS = {ROLE_RECORD_ID: 0, ROLE_TYPE: 1, ROLE_TIMESTAMP: 3,
+                    ROLE_FORMAT: 4, ROLE_CONTENT_HASH: 5}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows: List[tuple] = []
+        self._display: List[str] = []
+        self.search_text: List[str] = []  # 预先转为小写的搜索文本
+        self._icons: List[QIcon] = []
+        self._rows_by_id: Dict[int, int] = {}
+        # 列表缩略图缓存 (record_id -> QIcon)，按需加载，LRU
+        self.thumbnails: Dict[int, QIcon] = OrderedDict()
+        placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        placeholder.fill(Qt.GlobalColor.transparent)
+        self.placeholder = QIcon(placeholder)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display[row]
+        if role == Qt.ItemDataRole.DecorationRole:
+            rec = self.rows[row]
+            if rec[1] == "image":
+                icon = self.thumbnails.get(rec[0])
+                if icon is None:
+                    return self.placeholder
+                self.thumbnails.move_to_end(rec[0])
+                return icon
+            return self._icons[row]
+        col = self.ROLE_COLUMNS.get(role)
+        return self.rows[row][col] if col is not None else None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+
+    def set_rows(self, rows: List[tuple], display: List[str], icons: List[QIcon],
+                 search_text: List[str]):
+        """Replace all rows; display, icons and search_text are parallel to rows"""
+        self.beginResetModel()
+        self.rows = rows
+        self._display = display
+        self._icons = icons
+        self.search_text = search_text
+        self._rows_by_id = {rec[0]: i for i, rec in enumerate(rows)}
+        # 移除已被删除或裁剪的记录的缩略图
+        self.thumbnails = OrderedDict(
+            (k, v) for k, v in self.thumbnails.items() if k in self._rows_by_id)
+        self.endResetModel()
+
+    def remove_row(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        rec = self.rows.pop(row)
+        del self._display[row]
+        del self._icons[row]
+        del self.search_text[row]
+        self.thumbnails.pop(rec[0], None)
+        self._rows_by_id = {r[0]: i for i, r in enumerate(self.rows)}
+        self.endRemoveRows()
+
+    def remove_id(self, record_id: int):
+        row = self._rows_by_id.get(record_id)
+        if row is not None:
+            self.remove_row(row)
+
+    def clear(self):
+        self.set_rows([], [], [], [])
+
+    def prepend_row(self, rec: tuple, display: str, icon: QIcon, search_text: str):
+        """Insert a row at the top, moving it there if the record is already listed"""
+        old_row = self._rows_by_id.get(rec[0])
+        if old_row is not None:
+            thumb = self.thumbnails.get(rec[0])
+            self.remove_row(old_row)
+            if thumb is not None:
+                self.thumbnails[rec[0]] = thumb
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.rows.insert(0, rec)
+        self._display.insert(0, display)
+        self._icons.insert(0, icon)
+        self.search_text.insert(0, search_text)
+        self._rows_by_id = {r[0]: i for i, r in enumerate(self.rows)}
+        self.endInsertRows()
+
+    def row_for_id(self, record_id: int) -> Optional[tuple]:
+        row = self._rows_by_id.get(record_id)
+        return self.rows[row] if row is not None else None
+
+    def replace_row(self, rec: tuple, display: str, icon: QIcon, search_text: str):
+        """Update a listed record in place"""
+        row = self._rows_by_id.get(rec[0])
+        if row is None:
+            return
+        self.rows[row] = rec
+        self._display[row] = display
+        self._icons[row] = icon
+        self.search_text[row] = search_text
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx)
+
+    def truncate(self, max_rows: int):
+        """Drop rows beyond max_rows from the bottom"""
+        if len(self.rows) <= max_rows:
+            return
+        self.beginRemoveRows(QModelIndex(), max_rows, len(self.rows) - 1)
+        for rec in self.rows[max_rows:]:
+            self.thumbnails.pop(rec[0], None)
+            self._rows_by_id.pop(rec[0], None)
+        del self.rows[max_rows:]
+        del self._display[max_rows:]
+        del self._icons[max_rows:]
+        del self.search_text[max_rows:]
+        self.endRemoveRows()
+
+    def set_thumbnail(self, record_id: int, icon: QIcon):
+        row = self._rows_by_id.get(record_id)
+        if row is None:
+            return
+        self.thumbnails[record_id] = icon
+        # 超出上限时丢弃最久未绘制的，再次滚动到时重新加载
+        while len(self.thumbnails) > ICON_CACHE_SIZE:
+            self.thumbnails.popitem(last=False)
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.DecorationRole])
+
+class HistoryFilterProxy(QSortFilterProxyModel):
+    """Substring filter over ClipListModel.search_text"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._needle = ""
+
+    def set_needle(self, text: str):
+        self._needle = text.lower()
+        self.invalidateRowsFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return not self._needle or self._needle in self.sourceModel().search_text[source_row]
+
+class DraggableListView(QListView):
     """支持拖拽内容的列表控件"""
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -798,19 +1464,23 @@ class DraggableListWidget(QListWidget):
     def startDrag(self, supportedActions):
         """开始拖拽操作"""
         try:
-            item = self.currentItem()
-            if not item or not self.parent_app:
+            index = self.currentIndex()
+            if not index.isValid() or not self.parent_app:
                 return
             
             # 获取当前记录
-            record_id = item.data(ROLE_RECORD_ID)
-            rec_type = item.data(ROLE_TYPE)
-            rec_format = item.data(ROLE_FORMAT)
+            record_id = index.data(ROLE_RECORD_ID)
+
+            # 选中行的详情通常已加载并解码，直接复用，无需再次读库
+            record = self.parent_app.current_record
+            if record is not None and record.id == record_id:
+                self._perform_drag(record, supportedActions)
+                return
             
             # 异步加载详细内容
             worker = DBWorker(self.parent_app.db_path, "get_detail", record_id=record_id)
             worker.signals.result.connect(lambda record: self._perform_drag(record, supportedActions))
-            self.parent_app.threadpool.start(worker)
+            self.parent_app.threadpool.start(worker, DETAIL_LOAD_PRIORITY)
             
         except Exception as e:
             logging.error(f"Start drag error: {e}", exc_info=True)
@@ -834,11 +1504,7 @@ class DraggableListWidget(QListWidget):
                         mime_data.setText(record.content)
                 elif record.format == "file":
                     # 文件路径
-                    urls = []
-                    for p in record.content.split('\n'):
-                        if p.strip():
-                            urls.append(QUrl.fromLocalFile(p.strip()))
-                    mime_data.setUrls(urls)
+                    mime_data.setUrls(file_urls(record.content))
                     mime_data.setText(record.content)
                 else:
                     # 纯文本
@@ -853,10 +1519,18 @@ class DraggableListWidget(QListWidget):
             drag.setMimeData(mime_data)
             
             # 设置拖拽图标（缩略图）
-            current_item = self.currentItem()
-            if current_item:
-                icon = current_item.icon()
-                if not icon.isNull():
+            index = self.currentIndex()
+            if record.type == "image" and not record.content.isNull():
+                # 列表缩略图只有图标大小，拖拽图标从原图生成并按内容哈希缓存
+                cache_key = f"drag:{record.content_hash}"
+                pixmap = QPixmapCache.find(cache_key)
+                if pixmap is None:
+                    pixmap = QPixmap.fromImage(downscale_image(record.content, 64, 64))
+                    QPixmapCache.insert(cache_key, pixmap)
+                drag.setPixmap(pixmap)
+            elif index.isValid():
+                icon = index.data(Qt.ItemDataRole.DecorationRole)
+                if isinstance(icon, QIcon) and not icon.isNull():
                     pixmap = icon.pixmap(64, 64)
                     drag.setPixmap(pixmap)
             
@@ -866,6 +1540,18 @@ class DraggableListWidget(QListWidget):
         except Exception as e:
             logging.error(f"Perform drag error: {e}", exc_info=True)
 
+class ThumbnailDelegate(QStyledItemDelegate):
+    """Loads image thumbnails the first time their row is painted"""
+    def __init__(self, parent_app, parent=None):
+        super().__init__(parent)
+        self.parent_app = parent_app
+
+    def paint(self, painter, option, index):
+        # 只有可见行会被绘制，在这里触发缩略图加载
+        if index.data(ROLE_TYPE) == "image":
+            self.parent_app.request_thumbnail(index.data(ROLE_RECORD_ID))
+        super().paint(painter, option, index)
+
 class ZoomableImageLabel(QLabel):
     """Scalable image viewer with mouse wheel support."""
     def __init__(self, parent=None):
@@ -876,19 +1562,27 @@ class ZoomableImageLabel(QLabel):
         self.max_zoom = 5.0
         self.original_width = 0
         self.original_height = 0
-
-    def set_image(self, image: Optional[QImage]):
+        self._mip: List[QImage] = []  # 原图、1/2、1/4 预缩放层级
+        # 拖动窗口时合并连续的 resize 事件
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(RESIZE_DEBOUNCE_MS)
+        self._resize_timer.timeout.connect(self._update_display)
+
+    def set_image(self, image: Optional[QImage], mips: Optional[List[QImage]] = None):
         if image is None:
             self.original_image = None
+            self._mip = []
             self.clear()
             return
         self.original_image = image
         self.original_width = image.width()
         self.original_height = image.height()
+        self._mip = mips or build_image_mips(image)
         self.zoom_factor = 1.0
         self._update_display()
 
-    def _update_display(self):
+    def _update_display(self, smooth: bool = True):
         if not self.original_image:
             return
 
@@ -904,10 +1598,16 @@ class ZoomableImageLabel(QLabel):
         final_width = int(self.original_width * final_scale)
         final_height = int(self.original_height * final_scale)
 
-        scaled = self.original_image.scaled(
+        # 选择不小于目标尺寸的最小层级，再平滑缩放
+        source = self.original_image
+        for level in self._mip:
+            if level.width() >= final_width and level.height() >= final_height:
+                source = level
+        scaled = source.scaled(
             final_width, final_height,
             Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
+            Qt.TransformationMode.SmoothTransformation if smooth
+            else Qt.TransformationMode.FastTransformation
         )
         self.setPixmap(QPixmap.fromImage(scaled))
 
@@ -921,7 +1621,9 @@ class ZoomableImageLabel(QLabel):
                 self.zoom_factor = min(self.max_zoom, self.zoom_factor + zoom_step)
             else:
                 self.zoom_factor = max(self.min_zoom, self.zoom_factor - zoom_step)
-            self._update_display()
+            # 连续滚动时先快速缩放预览，停止后再做一次平滑缩放
+            self._update_display(smooth=False)
+            self._resize_timer.start()
             event.accept()
         else:
             super().wheelEvent(event)
@@ -933,7 +1635,7 @@ class ZoomableImageLabel(QLabel):
     def resizeEvent(self, event):
         super().resizeEvent(event)
         if self.original_image:
-            self._update_display()
+            self._resize_timer.start()
 
 class SettingsDialog(QDialog):
     """Settings Dialog"""
@@ -957,21 +1659,15 @@ class SettingsDialog(QDialog):
         self.combo_theme.addItem(tr("theme_system", current_lang), "system")
         self.combo_theme.addItem(tr("theme_light", current_lang), "light")
         self.combo_theme.addItem(tr("theme_dark", current_lang), "dark")
-        current_theme = settings.get("app_theme", "system")
-        idx = 0
-        for i in range(self.combo_theme.count()):
-            if self.combo_theme.itemData(i) == current_theme:
-                idx = i
-                break
-        self.combo_theme.setCurrentIndex(idx)
+        # findData 在 C++ 侧查找，未找到返回 -1 时回退到第一项
+        self.combo_theme.setCurrentIndex(max(self.combo_theme.findData(settings.get("app_theme", "system")), 0))
         form.addRow(tr("theme", current_lang), self.combo_theme)
 
         # Language
         self.combo_lang = QComboBox()
         self.combo_lang.addItem(tr("language_zh", current_lang), "zh_CN")
         self.combo_lang.addItem(tr("language_en", current_lang), "en_US")
-        lang_idx = 0 if current_lang == "zh_CN" else 1
-        self.combo_lang.setCurrentIndex(lang_idx)
+        self.combo_lang.setCurrentIndex(max(self.combo_lang.findData(current_lang), 0))
         form.addRow(tr("language", current_lang), self.combo_lang)
 
         # History Limit
@@ -1043,7 +1739,7 @@ class ClipKeepApp(QMainWindow):
         # Load icon safely
         try:
             self.setWindowIcon(QIcon(resource_path("clipkeep.ico")))
-        except:
+        except (OSError, RuntimeError):
             pass
 
         # Core Setup
@@ -1055,9 +1751,12 @@ class ClipKeepApp(QMainWindow):
         self.config_dir.mkdir(exist_ok=True)
         self.db_path = self.config_dir / "clipboard.db"
         self.settings_file = self.config_dir / "settings.json"
+        self._settings_writer = SettingsFileWriter(self.settings_file)
+        self._settings_seq = 0  # 最近提交的设置快照序号
         self.temp_dir = self.config_dir / "temp"
 
         self.settings = self.load_settings()
+        self._snapshot_settings()
         self.current_lang = self.settings.get("language", "zh_CN")
         self.max_history = self.settings.get("max_history", DEFAULT_MAX_HISTORY)
 
@@ -1082,25 +1781,63 @@ class ClipKeepApp(QMainWindow):
 
         # Database & Threading
         self.db = ClipboardDatabase(self.db_path)
+        self.db.signals.completed.connect(self.on_db_write_completed)
+        self.db.signals.touch_missed.connect(self.on_touch_missed)
+        self.db.signals.failed.connect(self.on_db_write_failed)
         self.threadpool = QThreadPool()
+        # 只读连接按线程保存：线程数固定且不过期，连接数量就不会随线程更替增长
+        self.threadpool.setMaxThreadCount(READ_POOL_THREADS)
+        self.threadpool.setExpiryTimeout(-1)
+        # 图片编码单独排队，避免突发截图占满线程池、拖慢列表与详情读取
+        self.image_pool = QThreadPool()
+        self.image_pool.setMaxThreadCount(IMAGE_POOL_THREADS)
+
+        # 最近图片的内容哈希 (LRU)，命中时只刷新时间戳，不再查库或重新编码
+        known = self.db.recent_hashes(self.max_history)
+        self._recent_hashes = OrderedDict(
+            (h, None) for h in reversed(known[:self._recent_hash_limit()])
+        )
+        # 历史中可能存在的哈希（只增不减的超集）；未命中即可确定是新内容，省去查库
+        self._known_hashes = set(known)
+        # 已发出刷新请求的图片，记录若已不存在则据此重新写入
+        self._pending_image_touches: Dict[str, QImage] = {}
 
         # State
         self.is_internal_copy = False
         self.force_quit = False
         self.current_record: Optional[ClipboardRecord] = None
         self.last_clipboard_hash = ""
+        self._last_clip_key = None  # 上次处理的 MIME 指纹
+        self._applied_stylesheet = None
+        self._sys_dark_cache: Optional[bool] = None  # 系统深色模式探测结果
         self.tray_message_shown = False  # 托盘提示是否已显示过
 
         # Edge Hide State
         self.is_hidden = False
         self.original_geometry = None
-        self.hide_animation = None
+        # 吸附/隐藏/显示共用同一个几何动画，_anim_role 记录当前用途
+        self.edge_animation = QPropertyAnimation(self, b"geometry")
+        self.edge_animation.finished.connect(self._on_edge_animation_finished)
+        self._anim_role = None
         self.at_edge_time = None  # 记录到达边缘的时间
         self.hide_pending = False  # 是否有待执行的隐藏
         self.show_pending = False  # 是否有待执行的显示
         
+        # 贴边检测由移动/进出窗口事件触发；只有隐藏后才需要轮询全局光标
         self.edge_hide_timer = QTimer()
+        self.edge_hide_timer.setInterval(EDGE_HIDDEN_POLL_MS)
         self.edge_hide_timer.timeout.connect(self.check_edge_hide)
+
+        self.edge_check_timer = QTimer()
+        self.edge_check_timer.setSingleShot(True)
+        self.edge_check_timer.setInterval(EDGE_SETTLE_MS)
+        self.edge_check_timer.timeout.connect(self.check_edge_hide)
+
+        # 主屏幕几何信息只在屏幕变化时更新
+        self._screen_geo = QRect()
+        self._watched_screen = None
+        QApplication.instance().primaryScreenChanged.connect(self._on_primary_screen_changed)
+        self._on_primary_screen_changed(QApplication.primaryScreen())
         
         self.edge_hide_delay_timer = QTimer()
         self.edge_hide_delay_timer.setSingleShot(True)
@@ -1111,11 +1848,28 @@ class ClipKeepApp(QMainWindow):
         self.edge_show_delay_timer.timeout.connect(self.execute_show)
 
         # Timers
+        self._settings_save_timer = QTimer()
+        self._settings_save_timer.setSingleShot(True)
+        self._settings_save_timer.setInterval(SETTINGS_SAVE_DEBOUNCE_MS)
+        self._settings_save_timer.timeout.connect(self._do_save_settings)
+
+        self._geometry_save_timer = QTimer()
+        self._geometry_save_timer.setSingleShot(True)
+        self._geometry_save_timer.setInterval(GEOMETRY_SAVE_IDLE_MS)
+        self._geometry_save_timer.timeout.connect(self._save_geometry_if_changed)
+
         self._save_timer = QTimer()
         self._save_timer.setSingleShot(True)
         self._save_timer.timeout.connect(self._do_save_pending)
-        self._pending_save_id = None
-        self._pending_save_text = None
+        self._pending_edits = {}  # record_id -> 最新文本
+
+        # 缩略图缓存 (clipboard hash -> 编码后的缩略图, LRU)
+        self._thumb_cache = OrderedDict()
+        self._thumb_requests = set()  # 正在加载缩略图的 record_id
+        # 列表行图标只取一次，刷新时复用
+        self._icon_dir = self.style().standardIcon(QStyle.StandardPixmap.SP_DirIcon)
+        self._icon_file = self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon)
+        self._icon_empty = QIcon()
 
         # UI Initialization
         self.init_ui()
@@ -1128,7 +1882,12 @@ class ClipKeepApp(QMainWindow):
 
         # Start monitoring
         self.clipboard = QApplication.clipboard()
-        self.clipboard.dataChanged.connect(self.on_clipboard_change)
+        # Windows 上一次复制会依次通告多种格式，合并连续的 dataChanged
+        self._clipboard_timer = QTimer(self)
+        self._clipboard_timer.setSingleShot(True)
+        self._clipboard_timer.setInterval(CLIPBOARD_DEBOUNCE_MS)
+        self._clipboard_timer.timeout.connect(self.on_clipboard_change)
+        self.clipboard.dataChanged.connect(self._clipboard_timer.start)
         
         # 设置全局快捷键 Alt+V
         self.setup_global_hotkey()
@@ -1163,7 +1922,8 @@ class ClipKeepApp(QMainWindow):
             )
         else:
             self.statusBar().showMessage(tr("self_check_passed", self.current_lang), 3000)
-            self.refresh_history_async()
+        # 托盘或临时目录的警告不影响读取历史；列表模型需与数据库一致（清空判断依赖它）
+        self.refresh_history_async()
 
     # -----------------------
     # Global Hotkey
@@ -1239,17 +1999,17 @@ class ClipKeepApp(QMainWindow):
     # -----------------------
     def check_edge_hide(self):
         """Check if window should hide/show at screen edge"""
-        if not self.settings.get("edge_hide_enabled", False):
+        if not self._edge_hide_enabled:
             return
         
         if not self.isVisible() or self.isMinimized():
             return
 
         # 如果正在播放动画，不做任何检查
-        if self.hide_animation and self.hide_animation.state() == QPropertyAnimation.State.Running:
+        if self._is_edge_animating():
             return
 
-        screen = QApplication.primaryScreen().geometry()
+        screen = self._screen_geo
         win_geo = self.geometry()
         cursor_pos = QCursor.pos()
 
@@ -1276,14 +2036,7 @@ class ClipKeepApp(QMainWindow):
                     snap_geo.moveTop(0)
                 
                 # 平滑吸附动画
-                if not self.hide_animation:
-                    self.hide_animation = QPropertyAnimation(self, b"geometry")
-                    self.hide_animation.setDuration(150)
-                    self.hide_animation.setStartValue(win_geo)
-                    self.hide_animation.setEndValue(snap_geo)
-                    self.hide_animation.setEasingCurve(QEasingCurve.Type.OutQuad)
-                    self.hide_animation.finished.connect(lambda: setattr(self, 'hide_animation', None))
-                    self.hide_animation.start()
+                self._animate_edge("snap", win_geo, snap_geo, 150, QEasingCurve.Type.OutQuad)
                 return
 
         if not self.is_hidden:
@@ -1345,13 +2098,33 @@ class ClipKeepApp(QMainWindow):
         self.show_pending = False
         self.show_from_edge_animated()
 
+    def _is_edge_animating(self) -> bool:
+        return self.edge_animation.state() == QPropertyAnimation.State.Running
+
+    def _animate_edge(self, role: str, start: QRect, end: QRect, duration: int,
+                      easing: QEasingCurve.Type):
+        """Run the shared geometry animation; role picks the finish handler"""
+        self._anim_role = role
+        self.edge_animation.setDuration(duration)
+        self.edge_animation.setStartValue(start)
+        self.edge_animation.setEndValue(end)
+        self.edge_animation.setEasingCurve(easing)
+        self.edge_animation.start()
+
+    def _on_edge_animation_finished(self):
+        role, self._anim_role = self._anim_role, None
+        if role == "hide":
+            self.on_hide_finished()
+        elif role == "show":
+            self.on_show_finished()
+
     def hide_to_edge_animated(self):
         """Hide window to edge with smooth animation"""
-        if self.is_hidden or self.hide_animation:
+        if self.is_hidden or self._is_edge_animating():
             return
 
         self.original_geometry = self.geometry()
-        screen = QApplication.primaryScreen().geometry()
+        screen = self._screen_geo
         geo = self.geometry()
 
         target_geo = QRect(geo)
@@ -1363,41 +2136,54 @@ class ClipKeepApp(QMainWindow):
         elif geo.y() <= EDGE_HIDE_THRESHOLD:
             target_geo.moveTop(-geo.height() + EDGE_SHOW_WIDTH)
 
-        self.hide_animation = QPropertyAnimation(self, b"geometry")
-        self.hide_animation.setDuration(ANIMATION_DURATION)
-        self.hide_animation.setStartValue(geo)
-        self.hide_animation.setEndValue(target_geo)
-        self.hide_animation.setEasingCurve(QEasingCurve.Type.OutCubic)
-        self.hide_animation.finished.connect(self.on_hide_finished)
-        self.hide_animation.start()
+        self._animate_edge("hide", geo, target_geo, ANIMATION_DURATION, QEasingCurve.Type.OutCubic)
 
     def on_hide_finished(self):
         """Called when hide animation finishes"""
         self.is_hidden = True
-        self.hide_animation = None
+        if self._edge_hide_enabled:
+            self.edge_hide_timer.start()
+        elif self.original_geometry:
+            # 动画期间贴边隐藏已被关闭，直接还原
+            self.setGeometry(self.original_geometry)
+            self.is_hidden = False
 
     def show_from_edge_animated(self):
         """Show window from edge with smooth animation"""
-        if not self.is_hidden or not self.original_geometry or self.hide_animation:
+        if not self.is_hidden or not self.original_geometry or self._is_edge_animating():
             return
 
-        current_geo = self.geometry()
-        
-        self.hide_animation = QPropertyAnimation(self, b"geometry")
-        self.hide_animation.setDuration(ANIMATION_DURATION)
-        self.hide_animation.setStartValue(current_geo)
-        self.hide_animation.setEndValue(self.original_geometry)
-        self.hide_animation.setEasingCurve(QEasingCurve.Type.OutCubic)
-        self.hide_animation.finished.connect(self.on_show_finished)
-        self.hide_animation.start()
+        self._animate_edge("show", self.geometry(), self.original_geometry,
+                           ANIMATION_DURATION, QEasingCurve.Type.OutCubic)
 
     def on_show_finished(self):
         """Called when show animation finishes"""
         self.is_hidden = False
-        self.hide_animation = None
         # 显示完成后，重置状态，允许再次隐藏
         self.at_edge_time = None
         self.hide_pending = False
+        self.edge_hide_timer.stop()
+        # 动画期间光标可能已离开窗口，立即检查一次
+        self.check_edge_hide()
+
+    def _on_primary_screen_changed(self, screen):
+        if self._watched_screen is not None:
+            try:
+                self._watched_screen.geometryChanged.disconnect(self._update_screen_geometry)
+            except (TypeError, RuntimeError):
+                pass
+        self._watched_screen = screen
+        if screen is not None:
+            screen.geometryChanged.connect(self._update_screen_geometry)
+            self._update_screen_geometry(screen.geometry())
+
+    def _update_screen_geometry(self, geometry: QRect):
+        self._screen_geo = QRect(geometry)
+
+    def schedule_edge_check(self):
+        """Re-evaluate edge hiding once the window settles"""
+        if self._edge_hide_enabled:
+            self.edge_check_timer.start()
 
     # -----------------------
     # Settings Management
@@ -1423,49 +2209,81 @@ class ClipKeepApp(QMainWindow):
         return defaults
 
     def save_settings_to_file(self):
+        """Coalesce settings writes; the JSON dump runs once things go quiet"""
+        self._settings_save_timer.start()
+
+    def _save_geometry_if_changed(self):
+        """Persist the window position once it has been idle for a while"""
+        old_geometry = self.settings.get("window_geometry")
+        self._store_window_geometry()
+        if self.settings.get("window_geometry") != old_geometry:
+            self.save_settings_to_file()
+
+    def _store_window_geometry(self):
+        # 只在窗口可见且未隐藏时保存几何信息
+        if self.isVisible() and not self.is_hidden:
+            geo = self.geometry()
+            screen = self._screen_geo
+
+            # 检查窗口是否在屏幕内
+            window_in_screen = (
+                geo.x() >= 0 and
+                geo.y() >= 0 and
+                geo.x() + geo.width() <= screen.width() and
+                geo.y() + geo.height() <= screen.height()
+            )
+
+            # 只有窗口完全在屏幕内才保存
+            if window_in_screen:
+                self.settings["window_geometry"] = {
+                    "x": geo.x(),
+                    "y": geo.y(),
+                    "width": geo.width(),
+                    "height": geo.height()
+                }
+                logging.info(f"Saved window geometry: {geo.x()}, {geo.y()}, {geo.width()}x{geo.height()}")
+            else:
+                logging.warning("Window outside screen bounds, not saving geometry")
+        else:
+            logging.info("Window hidden or invisible, not saving geometry")
+
+    def _do_save_settings(self, wait: bool = False):
+        self._settings_save_timer.stop()
+        self._geometry_save_timer.stop()
         try:
-            # 只在窗口可见且未隐藏时保存几何信息
-            if self.isVisible() and not self.is_hidden:
-                geo = self.geometry()
-                screen = QApplication.primaryScreen().geometry()
-                
-                # 检查窗口是否在屏幕内
-                window_in_screen = (
-                    geo.x() >= 0 and 
-                    geo.y() >= 0 and
-                    geo.x() + geo.width() <= screen.width() and
-                    geo.y() + geo.height() <= screen.height()
-                )
-                
-                # 只有窗口完全在屏幕内才保存
-                if window_in_screen:
-                    self.settings["window_geometry"] = {
-                        "x": geo.x(),
-                        "y": geo.y(),
-                        "width": geo.width(),
-                        "height": geo.height()
-                    }
-                    logging.info(f"Saved window geometry: {geo.x()}, {geo.y()}, {geo.width()}x{geo.height()}")
-                else:
-                    logging.warning("Window outside screen bounds, not saving geometry")
+            self._store_window_geometry()
+
+            # 提交时复制一份，写入线程与后续修改互不影响
+            self._settings_seq += 1
+            worker = SettingsSaveWorker(self._settings_writer, copy.deepcopy(self.settings),
+                                        self._settings_seq)
+            if wait:
+                worker.run()
             else:
-                logging.info("Window hidden or invisible, not saving geometry")
-            
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, ensure_ascii=False, indent=2)
+                self.threadpool.start(worker)
         except Exception as e:
             logging.error(f"Error saving settings: {e}", exc_info=True)
 
     def is_system_dark(self) -> bool:
-        """Detect system dark mode"""
+        """Detect system dark mode (cached until the palette changes)"""
+        if self._sys_dark_cache is not None:
+            return self._sys_dark_cache
         try:
             pal = QApplication.palette()
             bg = pal.color(QPalette.ColorRole.Window)
             r, g, b = bg.red(), bg.green(), bg.blue()
             luminance = 0.2126 * r + 0.7152 * g + 0.0722 * b
-            return luminance < 128
-        except:
+            self._sys_dark_cache = luminance < 128
+        except RuntimeError:
             return False
+        return self._sys_dark_cache
+
+    def _invalidate_system_dark(self, *args):
+        was_cached = self._sys_dark_cache is not None  # 多个信号同时到达时只重新应用一次
+        self._sys_dark_cache = None
+        if was_cached and self.settings.get("app_theme", "system") == "system":
+            # 跟随系统主题时重新应用样式；样式表未变化时 apply_settings 不会重绘
+            QTimer.singleShot(0, self.apply_settings)
 
     def get_current_stylesheet(self, theme: str) -> str:
         """Return stylesheet based on theme"""
@@ -1476,35 +2294,52 @@ class ClipKeepApp(QMainWindow):
         else:
             return DARK_STYLESHEET if self.is_system_dark() else WINUI_STYLESHEET
 
+    def _snapshot_settings(self):
+        """Copy flags read on hot paths (edge checks, clipboard events) into attributes"""
+        self._edge_hide_enabled = bool(self.settings.get("edge_hide_enabled", False))
+        self._enable_rich_text = bool(self.settings.get("enable_rich_text", True))
+        self._enable_file_paths = bool(self.settings.get("enable_file_paths", True))
+        self._save_original_image = bool(self.settings.get("save_original_image", False))
+
     def apply_settings(self):
-        # Window flags
-        if self.settings.get("window_always_on_top", False):
-            self.setWindowFlags(self.windowFlags() | Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.Tool)
-        else:
-            self.setWindowFlags((self.windowFlags() & ~Qt.WindowType.WindowStaysOnTopHint) | Qt.WindowType.Tool)
-        
+        self._snapshot_settings()
+        # Window flags (修改标志会重建原生窗口并隐藏它，仅在变化时逐个切换)
+        flags_changed = False
+        for flag, wanted in ((Qt.WindowType.Tool, True),
+                             (Qt.WindowType.WindowStaysOnTopHint,
+                              bool(self.settings.get("window_always_on_top", False)))):
+            if ((self.windowFlags() & flag) == flag) != wanted:
+                self.setWindowFlag(flag, wanted)
+                flags_changed = True
+
         self.max_history = self.settings.get("max_history", DEFAULT_MAX_HISTORY)
 
-        # Apply theme
+        # Apply theme (样式表未变化时跳过，避免重新解析和全量 repolish)
         theme = self.settings.get("app_theme", "system")
         stylesheet = self.get_current_stylesheet(theme)
-        self.setStyleSheet(stylesheet)
+        if stylesheet != self._applied_stylesheet:
+            self.setStyleSheet(stylesheet)
+            self._applied_stylesheet = stylesheet
 
         # Widget styles
         if stylesheet is DARK_STYLESHEET:
-            self.image_viewer.setStyleSheet("background-color: #1e1e1e; border: 1px dashed #333; border-radius: 6px;")
-            self.zoom_hint.setStyleSheet("color: #999; font-size: 11px; margin-top: 4px;")
-            self.count_label.setStyleSheet("color: #cfcfcf; font-weight: bold;")
+            set_style_if_changed(self.image_viewer, "background-color: #1e1e1e; border: 1px dashed #333; border-radius: 6px;")
+            set_style_if_changed(self.zoom_hint, "color: #999; font-size: 11px; margin-top: 4px;")
+            set_style_if_changed(self.count_label, "color: #cfcfcf; font-weight: bold;")
         else:
-            self.image_viewer.setStyleSheet("background-color: #fafafa; border: 1px dashed #ccc; border-radius: 6px;")
-            self.zoom_hint.setStyleSheet("color: #999; font-size: 11px; margin-top: 4px;")
-            self.count_label.setStyleSheet("color: #666; font-weight: bold;")
+            set_style_if_changed(self.image_viewer, "background-color: #fafafa; border: 1px dashed #ccc; border-radius: 6px;")
+            set_style_if_changed(self.zoom_hint, "color: #999; font-size: 11px; margin-top: 4px;")
+            set_style_if_changed(self.count_label, "color: #666; font-weight: bold;")
 
-        # Start/stop edge hide timer
-        if self.settings.get("edge_hide_enabled", False):
-            self.edge_hide_timer.start(100)
+        # Start/stop edge hide detection
+        if self._edge_hide_enabled:
+            if self.is_hidden:
+                self.edge_hide_timer.start()
+            else:
+                self.schedule_edge_check()
         else:
             self.edge_hide_timer.stop()
+            self.edge_check_timer.stop()
             self.edge_hide_delay_timer.stop()
             self.edge_show_delay_timer.stop()
             if self.is_hidden and self.original_geometry:
@@ -1513,7 +2348,8 @@ class ClipKeepApp(QMainWindow):
                 self.hide_pending = False
                 self.show_pending = False
 
-        self.show()
+        if flags_changed:
+            self.show()
 
     def update_ui_language(self):
         """Update all UI text"""
@@ -1540,6 +2376,7 @@ class ClipKeepApp(QMainWindow):
             
             self.apply_settings()
             self.db.trim_to_limit(self.max_history)
+            self._trim_recent_hashes()
             self.refresh_history_async()
             self.statusBar().showMessage(tr("settings_saved", self.current_lang), 2000)
 
@@ -1578,7 +2415,12 @@ class ClipKeepApp(QMainWindow):
         # Search
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText(tr("search_placeholder", self.current_lang))
-        self.search_box.textChanged.connect(self.filter_history)
+        # 输入停顿后再过滤，避免每个按键都遍历一次
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(lambda: self.filter_history(self.search_box.text()))
+        self.search_box.textChanged.connect(self._search_timer.start)
         main_layout.addWidget(self.search_box)
 
         # Splitter
@@ -1586,11 +2428,22 @@ class ClipKeepApp(QMainWindow):
         splitter.setHandleWidth(8)
 
         # History List
-        self.history_list = DraggableListWidget()  # 使用自定义列表控件
+        self.history_model = ClipListModel(self)
+        self.history_proxy = HistoryFilterProxy(self)
+        self.history_proxy.setSourceModel(self.history_model)
+        self.history_list = DraggableListView()  # 使用自定义列表控件
         self.history_list.parent_app = self  # 设置父应用引用
-        self.history_list.currentItemChanged.connect(self.on_item_selected)
-        self.history_list.itemClicked.connect(self.on_item_clicked)
-        self.history_list.itemDoubleClicked.connect(self.on_item_double_clicked)
+        self.history_list.setModel(self.history_proxy)
+        # 分批布局，长列表刷新时不阻塞界面
+        self.history_list.setLayoutMode(QListView.LayoutMode.Batched)
+        self.history_list.setBatchSize(50)
+        # 显式设置图标尺寸（与样式默认值相同），缩略图按此尺寸在工作线程缩放
+        icon_px = self.history_list.style().pixelMetric(QStyle.PixelMetric.PM_SmallIconSize)
+        self.history_list.setIconSize(QSize(icon_px, icon_px))
+        self.history_list.setItemDelegate(ThumbnailDelegate(self, self.history_list))
+        self.history_list.selectionModel().currentChanged.connect(self.on_item_selected)
+        self.history_list.clicked.connect(self.on_item_clicked)
+        self.history_list.doubleClicked.connect(self.on_item_double_clicked)
         self.history_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.history_list.customContextMenuRequested.connect(self.show_context_menu)
         self.history_list.setDragEnabled(True)
@@ -1674,6 +2527,36 @@ class ClipKeepApp(QMainWindow):
                 self.activateWindow()
                 self.raise_()
 
+    def event(self, event):
+        # ApplicationPaletteChange 只经过 event()，不会转发到 changeEvent()
+        if event.type() == QEvent.Type.ApplicationPaletteChange:
+            self._invalidate_system_dark()
+        return super().event(event)
+
+    def moveEvent(self, event):
+        super().moveEvent(event)
+        self.schedule_edge_check()
+        self._geometry_save_timer.start()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_edge_check()
+        self._geometry_save_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.schedule_edge_check()
+
+    def enterEvent(self, event):
+        super().enterEvent(event)
+        if self._edge_hide_enabled:
+            self.check_edge_hide()
+
+    def leaveEvent(self, event):
+        super().leaveEvent(event)
+        if self._edge_hide_enabled:
+            self.check_edge_hide()
+
     def closeEvent(self, event):
         """Minimize to tray"""
         if self.force_quit:
@@ -1690,8 +2573,8 @@ class ClipKeepApp(QMainWindow):
 
     def quit_application(self):
         """Exit application"""
-        # Save window geometry before quit
-        self.save_settings_to_file()
+        # Save window geometry before quit (立即写入，不等防抖)
+        self._do_save_settings(wait=True)
         
         # 停止全局快捷键监听
         if PYNPUT_AVAILABLE and hasattr(self, 'keyboard_listener'):
@@ -1702,6 +2585,11 @@ class ClipKeepApp(QMainWindow):
                 pass
         
         self.force_quit = True
+        self._do_save_pending()
+        # 等待正在读取的工作线程结束，再关闭它们的连接
+        self.threadpool.clear()
+        self.threadpool.waitForDone(2000)
+        self.db.close()
         QApplication.quit()
 
     def setup_shortcuts(self):
@@ -1722,63 +2610,73 @@ class ClipKeepApp(QMainWindow):
 
     def strip_html_tags(self, html: str) -> str:
         """Remove HTML tags"""
-        try:
-            html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-            html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
-            html = re.sub(r'<[^>]+>', '', html)
-            html = html.replace('&nbsp;', ' ').replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
-            html = re.sub(r'\s+', ' ', html).strip()
-            return html
-        except:
-            return html[:100]
-
-    def on_history_loaded(self, records: List[ClipboardRecord]):
-        self.history_list.clear()
-
-        for rec in records:
-            if rec.type == "text":
-                if rec.format == "file":
-                    line_count = rec.content.count('\n') + 1
-                    first_file = rec.content.split('\n')[0] if rec.content else ""
-                    file_name = Path(first_file).name if first_file else "..."
-                    display_text = f"{tr('file_list', self.current_lang)} ({line_count}): {file_name}"
-                    icon = self.style().standardIcon(QStyle.StandardPixmap.SP_DirIcon)
-                elif rec.format == "html":
-                    plain_text = self.strip_html_tags(rec.content)
-                    preview = plain_text[:80].replace("\n", " ")
-                    display_text = tr("rich_text_prefix", self.current_lang) + preview
-                    icon = self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon)
-                else:
-                    display_text = rec.content[:80].replace("\n", " ")
-                    icon = QIcon()
-
-                item = QListWidgetItem(display_text)
-                item.setData(ROLE_TYPE, "text")
-
-            elif rec.type == "image":
-                pix = QPixmap()
-                if rec.thumbnail:
-                    pix.loadFromData(rec.thumbnail)
-                icon = QIcon(pix)
-                item = QListWidgetItem(tr("image", self.current_lang))
-                item.setData(ROLE_TYPE, "image")
-
-            item.setData(ROLE_RECORD_ID, rec.id)
-            item.setData(ROLE_TIMESTAMP, rec.timestamp)
-            item.setData(ROLE_FORMAT, rec.format)
-            item.setData(ROLE_CONTENT_HASH, rec.content_hash)
-            item.setIcon(icon)
-            
-            # 设置拖拽数据
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsDragEnabled)
+        return strip_html_tags(html)
+
+    def on_history_loaded(self, rows: List[tuple]):
+        display, icons, search_text = [], [], []
+        for row in rows:
+            display_text, icon, searchable = self._row_presentation(row)
+            display.append(display_text)
+            icons.append(icon)
+            search_text.append(searchable)
+
+        self.history_model.set_rows(rows, display, icons, search_text)
+        # 模型重置不会发出 currentChanged，与原先清空列表的行为保持一致
+        self.clear_detail_view()
+        self.update_count_label()
 
-            self.history_list.addItem(item)
+    def _row_presentation(self, row: tuple) -> Tuple[str, QIcon, str]:
+        """Display text, icon and lowercase search text for a history row"""
+        _, rec_type, content, _, fmt, _ = row
+        searchable = ""
+        if rec_type == "text":
+            if fmt == "file":
+                line_count = content.count('\n') + 1
+                nl = content.find('\n')
+                first_file = content if nl < 0 else content[:nl]
+                # 不构造 Path 对象，直接按两种分隔符取最后一段
+                file_name = first_file.rstrip('/\\').rsplit('/', 1)[-1].rsplit('\\', 1)[-1] or "..."
+                display_text = f"{tr('file_list', self.current_lang)} ({line_count}): {file_name}"
+                icon = self._icon_dir
+                searchable = content[:SEARCH_PREFIX_CHARS]
+            elif fmt == "html":
+                plain_text = self.strip_html_tags(content)
+                preview = plain_text[:80].replace("\n", " ")
+                display_text = tr("rich_text_prefix", self.current_lang) + preview
+                icon = self._icon_file
+                searchable = plain_text[:SEARCH_PREFIX_CHARS]
+            else:
+                display_text = content[:80].replace("\n", " ")
+                icon = self._icon_empty
+                searchable = content[:SEARCH_PREFIX_CHARS]
+        else:
+            display_text = tr("image", self.current_lang)
+            icon = self._icon_empty  # 缩略图由 ClipListModel 按需提供
 
-        self.update_count_label()
+        return display_text, icon, f"{display_text}\n{searchable}".lower()
+
+    def request_thumbnail(self, record_id: int):
+        """Load a thumbnail in the background unless cached or in flight"""
+        if record_id in self.history_model.thumbnails or record_id in self._thumb_requests:
+            return
+        self._thumb_requests.add(record_id)
+        dpr = self.history_list.devicePixelRatioF()
+        worker = DBWorker(self.db_path, "get_thumb", record_id=record_id,
+                          icon_px=round(self.history_list.iconSize().width() * dpr), dpr=dpr)
+        worker.signals.result.connect(self.on_thumbnail_loaded)
+        self.threadpool.start(worker)
+
+    def on_thumbnail_loaded(self, result):
+        if not result:
+            return
+        record_id, image = result
+        self._thumb_requests.discard(record_id)
+        icon = QIcon(QPixmap.fromImage(image)) if image is not None else self.history_model.placeholder
+        self.history_model.set_thumbnail(record_id, icon)
 
     def on_item_selected(self, current, previous):
         """Load detail when item selected"""
-        if not current:
+        if not current.isValid():
             self.clear_detail_view()
             return
 
@@ -1788,13 +2686,16 @@ class ClipKeepApp(QMainWindow):
         self.image_viewer.hide()
         self.zoom_hint.hide()
 
-        worker = DBWorker(self.db_path, "get_detail", record_id=record_id)
+        worker = DBWorker(self.db_path, "get_detail", record_id=record_id, with_mips=True)
         worker.signals.result.connect(self.on_detail_loaded)
-        self.threadpool.start(worker)
+        self.threadpool.start(worker, DETAIL_LOAD_PRIORITY)
 
     def on_detail_loaded(self, record: Optional[ClipboardRecord]):
         if not record:
             return
+        # 详情加载可能乱序完成，丢弃已不是当前选中行的结果
+        if record.id != self.history_list.currentIndex().data(ROLE_RECORD_ID):
+            return
 
         self.current_record = record
 
@@ -1810,7 +2711,7 @@ class ClipKeepApp(QMainWindow):
         elif record.type == "image":
             self.image_viewer.show()
             self.zoom_hint.show()
-            self.image_viewer.set_image(record.content)
+            self.image_viewer.set_image(record.content, record.image_mips)
 
     def clear_detail_view(self):
         self.text_editor.hide()
@@ -1821,11 +2722,11 @@ class ClipKeepApp(QMainWindow):
     # -----------------------
     # Clipboard Operations
     # -----------------------
-    def on_item_clicked(self, item):
+    def on_item_clicked(self, index):
         """Single click to copy"""
         self.copy_selected_to_system()
 
-    def on_item_double_clicked(self, item):
+    def on_item_double_clicked(self, index):
         """Double click to open"""
         if not self.current_record:
             return
@@ -1838,90 +2739,176 @@ class ClipKeepApp(QMainWindow):
     def on_clipboard_change(self):
         if self.is_internal_copy:
             self.is_internal_copy = False
+            self._last_clip_key = None
             return
 
         mime_data = self.clipboard.mimeData()
-        
+
+        # 非图片内容先比较廉价的 MIME 指纹，未变化则跳过
+        if not mime_data.hasImage():
+            clip_key = (tuple(mime_data.formats()), mime_data.text(),
+                        mime_data.html() if mime_data.hasHtml() else None)
+            if clip_key == self._last_clip_key:
+                return
+            self._last_clip_key = clip_key
+        else:
+            self._last_clip_key = None
+
         # Priority 1: Images
         if mime_data.hasImage():
             image = self.clipboard.image()
             if not image.isNull():
-                byte_array = QByteArray()
-                buffer = QBuffer(byte_array)
-                buffer.open(QBuffer.OpenModeFlag.WriteOnly)
-                image.save(buffer, "PNG")
-                buffer.close()
-                current_hash = hashlib.md5(byte_array.data()).hexdigest()
-                
-                if current_hash != self.last_clipboard_hash and not self.db.check_duplicate_hash(current_hash):
+                current_hash = image_digest(image)
+
+                if current_hash != self.last_clipboard_hash:
                     self.last_clipboard_hash = current_hash
-                    self.add_image_record_async(image)
+                    if current_hash not in self._recent_hashes and (
+                            current_hash not in self._known_hashes
+                            or not self.db.check_duplicate_hash(current_hash)):
+                        self.add_image_record_async(image, current_hash,
+                                                    self._encoded_clipboard_image(mime_data))
+                        self._remember_hash(current_hash)
+                        return
+                    # 已存在的图片无需重新编码，只移到顶部
+                    self._pending_image_touches[current_hash] = image
+                    self.db.touch_record(current_hash)
+                    self._remember_hash(current_hash)
                 return
 
         # Priority 2: Files
-        if self.settings.get("enable_file_paths") and mime_data.hasUrls():
+        if self._enable_file_paths and mime_data.hasUrls():
             urls = mime_data.urls()
             local_files = [u.toLocalFile() for u in urls if u.isLocalFile()]
             if local_files:
                 content = "\n".join(local_files)
-                current_hash = hashlib.md5(content.encode()).hexdigest()
-                
-                if current_hash != self.last_clipboard_hash and not self.db.check_duplicate_hash(current_hash):
+                current_hash = content_digest(content.encode())
+
+                if current_hash != self.last_clipboard_hash:
                     self.last_clipboard_hash = current_hash
-                    self.add_text_record(content, "file")
+                    self.add_text_record(content, "file", current_hash)
                 return
 
         # Priority 3: HTML
-        if self.settings.get("enable_rich_text") and mime_data.hasHtml():
+        if self._enable_rich_text and mime_data.hasHtml():
             html_content = mime_data.html()
             if len(html_content) > 20:
-                current_hash = hashlib.md5(html_content.encode()).hexdigest()
-                
-                if current_hash != self.last_clipboard_hash and not self.db.check_duplicate_hash(current_hash):
+                current_hash = content_digest(html_content.encode())
+
+                if current_hash != self.last_clipboard_hash:
                     self.last_clipboard_hash = current_hash
-                    self.add_text_record(html_content, "html")
+                    self.add_text_record(html_content, "html", current_hash)
                 return
 
         # Priority 4: Text
         if mime_data.hasText():
             text = self.clipboard.text().strip()
             if text:
-                current_hash = hashlib.md5(text.encode()).hexdigest()
-                
-                if current_hash != self.last_clipboard_hash and not self.db.check_duplicate_hash(current_hash):
+                current_hash = content_digest(text.encode())
+
+                if current_hash != self.last_clipboard_hash:
                     self.last_clipboard_hash = current_hash
-                    self.add_text_record(text, "plain")
+                    self.add_text_record(text, "plain", current_hash)
 
-    def add_text_record(self, text: str, fmt: str):
+    def add_text_record(self, text: str, fmt: str, content_hash: str):
         try:
-            self.db.add_text_record(text, fmt)
-            self.db.trim_to_limit(self.max_history)
-            self.refresh_history_async()
-            # 新内容添加后，滚动到顶部
-            QTimer.singleShot(100, lambda: self.history_list.scrollToTop())
+            # 重复文本由 upsert 刷新时间戳，记录已被裁剪时也能重新写入
+            self.db.add_text_record(text, fmt, content_hash, trim_to=self.max_history)
         except Exception as e:
             print(f"Add text error: {e}")
 
-    def add_image_record_async(self, image: QImage):
+    def on_touch_missed(self, content_hash: str):
+        """Re-add an image whose record vanished before the touch landed"""
+        image = self._pending_image_touches.pop(content_hash, None)
+        if image is not None:
+            self.add_image_record_async(image, content_hash)
+
+    def on_db_write_failed(self, op: str, kwargs: dict):
+        """Release what a failed write was holding on the UI side"""
+        if op == "touch":
+            self._pending_image_touches.pop(kwargs["content_hash"], None)
+
+    def _recent_hash_limit(self) -> int:
+        return min(RECENT_HASH_CACHE_SIZE, self.max_history)
+
+    def _remember_hash(self, content_hash: str):
+        self._recent_hashes[content_hash] = None
+        self._recent_hashes.move_to_end(content_hash)
+        self._known_hashes.add(content_hash)
+        self._trim_recent_hashes()
+
+    def _trim_recent_hashes(self):
+        limit = self._recent_hash_limit()
+        while len(self._recent_hashes) > limit:
+            self._recent_hashes.popitem(last=False)
+
+    def _encoded_clipboard_image(self, mime_data: QMimeData) -> Optional[Tuple[bytes, str]]:
+        """The image's original PNG/JPEG bytes, when the source offers them"""
+        # 只取 formats() 中已声明的格式，且仅在实际保存时才读取
+        formats = mime_data.formats()
+        for mime_type, fmt in (("image/jpeg", "JPEG"), ("image/png", "PNG")):
+            if mime_type in formats:
+                data = mime_data.data(mime_type).data()
+                if data:
+                    return data, fmt
+        return None
+
+    def add_image_record_async(self, image: QImage, content_hash: str,
+                               encoded_source: Optional[Tuple[bytes, str]] = None):
         """Add image using worker thread"""
         try:
+            cached_thumb = self._thumb_cache.get(content_hash)
+            if cached_thumb is not None:
+                self._thumb_cache.move_to_end(content_hash)
+
             worker = ImageProcessWorker(
                 image,
-                self.db_path,
+                self.db,
                 MAX_IMAGE_AREA_PIXELS,
-                self.settings.get("save_original_image", False)
+                self._save_original_image,
+                self.max_history,
+                content_hash,
+                cached_thumb,
+                encoded_source
             )
-            worker.signals.result.connect(self.on_image_saved)
-            worker.signals.finished.connect(lambda: self.db.trim_to_limit(self.max_history))
-            self.threadpool.start(worker)
+            worker.signals.result.connect(self.on_image_processed)
+            self.image_pool.start(worker)
         except Exception as e:
             print(f"Add image error: {e}")
 
-    def on_image_saved(self, content_hash: str):
-        """Called when image is saved"""
-        self.refresh_history_async()
-        # 新内容添加后，滚动到顶部
-        QTimer.singleShot(100, lambda: self.history_list.scrollToTop())
+    def on_image_processed(self, result: tuple):
+        """Remember the thumbnail so a re-copied image skips encoding"""
+        content_hash, thumb_bytes = result
+        self._thumb_cache[content_hash] = thumb_bytes
+        self._thumb_cache.move_to_end(content_hash)
+        while len(self._thumb_cache) > THUMBNAIL_CACHE_SIZE:
+            self._thumb_cache.popitem(last=False)
+
+    def on_db_write_completed(self, op: str, result):
+        """Called on the UI thread after the writer commits an operation"""
+        if op == "touch" and result:
+            self._pending_image_touches.pop(result[5], None)
+        if op in ("add_text", "add_image", "touch") and result:
+            # 只把新增或刷新的记录移到列表顶部，不重新加载整个列表
+            self.history_model.prepend_row(result, *self._row_presentation(result))
+            self.history_model.truncate(self.max_history)
+            self.update_count_label()
+            # 新内容添加后，滚动到顶部
+            QTimer.singleShot(100, lambda: self.history_list.scrollToTop())
+        elif op == "update_text_batch":
+            # 编辑后的文本与新哈希同步到列表预览
+            for record_id, (text, content_hash, merged) in result.items():
+                if merged is not None:
+                    self.history_model.remove_id(merged)
+                row = self.history_model.row_for_id(record_id)
+                if row is not None:
+                    self._recent_hashes.pop(row[5], None)
+                    rec = row[:2] + (text,) + row[3:5] + (content_hash,)
+                    self.history_model.replace_row(rec, *self._row_presentation(rec))
+                self._known_hashes.add(content_hash)
+            # 原文已不对应任何记录，再次复制时不能被当作重复跳过
+            self.last_clipboard_hash = None
+            self._last_clip_key = None
+            self.update_count_label()
 
     def copy_selected_to_system(self):
         if not self.current_record:
@@ -1941,14 +2928,8 @@ class ClipKeepApp(QMainWindow):
                     self.clipboard.setMimeData(mime_data)
                     self.statusBar().showMessage(tr("copied_html", self.current_lang), 2000)
                 elif self.current_record.format == "file":
-                    urls = []
-                    paths = self.current_record.content.split('\n')
-                    for p in paths:
-                        if p.strip():
-                            urls.append(QUrl.fromLocalFile(p.strip()))
-
                     mime_data = QMimeData()
-                    mime_data.setUrls(urls)
+                    mime_data.setUrls(file_urls(self.current_record.content))
                     mime_data.setText(self.current_record.content)
                     self.clipboard.setMimeData(mime_data)
                     self.statusBar().showMessage(tr("copied_file", self.current_lang), 2000)
@@ -2002,8 +2983,12 @@ class ClipKeepApp(QMainWindow):
             fmt = self.current_record.format.lower()
             temp_file = self.temp_manager.get_temp_file(self.current_record.id, fmt)
             
-            # Save and release
-            success = self.current_record.content.save(str(temp_file), self.current_record.format)
+            if self.current_record.encoded_data:
+                # 直接写出库中的原始字节，无需重新编码
+                temp_file.write_bytes(self.current_record.encoded_data)
+                success = True
+            else:
+                success = self.current_record.content.save(str(temp_file), self.current_record.format)
             
             if success:
                 QDesktopServices.openUrl(QUrl.fromLocalFile(str(temp_file)))
@@ -2015,16 +3000,16 @@ class ClipKeepApp(QMainWindow):
             QMessageBox.critical(self, tr("open_failed", self.current_lang), str(e))
 
     def delete_selected(self):
-        item = self.history_list.currentItem()
-        if not item:
+        index = self.history_list.currentIndex()
+        if not index.isValid():
             return
 
         try:
-            row = self.history_list.row(item)
-            record_id = item.data(ROLE_RECORD_ID)
+            record_id = index.data(ROLE_RECORD_ID)
+            self._recent_hashes.pop(index.data(ROLE_CONTENT_HASH), None)
 
             self.db.delete_record(record_id)
-            self.history_list.takeItem(row)
+            self.history_model.remove_row(self.history_proxy.mapToSource(index).row())
             self.clear_detail_view()
             self.update_count_label()
             self.statusBar().showMessage(tr("deleted", self.current_lang), 1500)
@@ -2032,7 +3017,8 @@ class ClipKeepApp(QMainWindow):
             print(f"Delete error: {e}")
 
     def clear_history(self):
-        if self.db.get_count() == 0:
+        # 列表模型与数据库同步，直接用行数判断，免去 UI 线程上的 COUNT(*)
+        if self.history_model.rowCount() == 0:
             return
 
         reply = QMessageBox.question(
@@ -2043,7 +3029,10 @@ class ClipKeepApp(QMainWindow):
         if reply == QMessageBox.StandardButton.Yes:
             try:
                 self.db.clear_all()
-                self.history_list.clear()
+                self._recent_hashes.clear()
+                self._known_hashes.clear()
+                strip_html_tags.cache_clear()
+                self.history_model.clear()
                 self.clear_detail_view()
                 self.update_count_label()
                 self.statusBar().showMessage(tr("history_cleared", self.current_lang), 2000)
@@ -2054,39 +3043,33 @@ class ClipKeepApp(QMainWindow):
     # UI Helpers
     # -----------------------
     def update_count_label(self):
-        count = self.history_list.count()
+        count = self.history_model.rowCount()
         self.count_label.setText(f"{tr('items', self.current_lang)}: {count} / {self.max_history}")
 
     def filter_history(self, text):
         """Filter history list using case-insensitive search"""
-        search_text = text.lower()
-        for i in range(self.history_list.count()):
-            item = self.history_list.item(i)
-            item_text = item.text().lower()
-            # 搜索项目文本
-            match = search_text in item_text
-            item.setHidden(not match)
+        self.history_proxy.set_needle(text)
 
     def clear_search(self):
         self.search_box.clear()
         self.search_box.clearFocus()
 
     def show_context_menu(self, pos):
-        item = self.history_list.itemAt(pos)
-        if not item:
+        index = self.history_list.indexAt(pos)
+        if not index.isValid():
             return
 
         menu = QMenu(self)
         
-        rec_type = item.data(ROLE_TYPE)
-        rec_format = item.data(ROLE_FORMAT)
+        rec_type = index.data(ROLE_TYPE)
+        rec_format = index.data(ROLE_FORMAT)
         if (rec_type == "text" and rec_format == "file") or rec_type == "image":
             menu.addAction(tr("context_open", self.current_lang), 
-                         lambda: self.on_item_double_clicked(item))
+                         lambda: self.on_item_double_clicked(index))
         
         menu.addAction(tr("context_delete", self.current_lang), self.delete_selected)
 
-        ts = item.data(ROLE_TIMESTAMP)
+        ts = index.data(ROLE_TIMESTAMP)
         time_str = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
         info_action = QAction(f"⏰ {time_str}", self)
         info_action.setEnabled(False)
@@ -2106,18 +3089,16 @@ class ClipKeepApp(QMainWindow):
             else:
                 new_text = self.text_editor.toPlainText()
 
-            self._pending_save_id = self.current_record.id
-            self._pending_save_text = new_text
+            self._pending_edits[self.current_record.id] = new_text
             self._save_timer.start(SAVE_DEBOUNCE_MS)
         except Exception as e:
             print(f"Text edit error: {e}")
 
     def _do_save_pending(self):
-        if self._pending_save_id and self._pending_save_text is not None:
+        if self._pending_edits:
             try:
-                self.db.update_text_content(self._pending_save_id, self._pending_save_text)
-                self._pending_save_id = None
-                self._pending_save_text = None
+                edits, self._pending_edits = self._pending_edits, {}
+                self.db.update_text_content_batch(edits)
                 self.statusBar().showMessage(tr("auto_saved", self.current_lang), 1000)
             except Exception as e:
                 print(f"Save error: {e}")
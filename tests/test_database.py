@@ -0,0 +1,129 @@
+import hashlib
+import importlib
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# ClipKeep 在导入时创建 ~/.clipkeep 并写日志，测试使用独立的 HOME
+_HOME = tempfile.mkdtemp(prefix="clipkeep-test-")
+os.environ["HOME"] = _HOME
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+ck = importlib.import_module("ClipKeep")
+
+
+class DatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "clipboard.db"
+        self.db = ck.ClipboardDatabase(self.db_path)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def add_text(self, text: str):
+        return self.db.add_text_record(text, "plain", ck.content_digest(text.encode())).result(5)
+
+    def contents(self):
+        return sorted(r[0] for r in self.db.conn.execute("SELECT content FROM records"))
+
+
+class TextEditTest(DatabaseTestCase):
+    def test_recopy_original_after_edit_keeps_both(self):
+        record_id = self.add_text("hello")[0]
+        self.db.update_text_content_batch({record_id: "hello edited"}).result(5)
+        self.add_text("hello")
+        self.assertEqual(self.contents(), ["hello", "hello edited"])
+
+    def test_edit_into_existing_text_merges_rows(self):
+        self.add_text("world")
+        record_id = self.add_text("hello")[0]
+        result = self.db.update_text_content_batch({record_id: "world"}).result(5)
+        self.assertIsNotNone(result[record_id][2])
+        self.assertEqual(self.contents(), ["world"])
+        row = self.db.conn.execute("SELECT id, content_hash FROM records").fetchone()
+        self.assertEqual(row, (record_id, ck.content_digest(b"world")))
+
+
+class ImageBlobTest(DatabaseTestCase):
+    def blob_files(self):
+        return sorted(p.name for p in ck.blob_dir_for(self.db_path).iterdir())
+
+    def test_failed_insert_leaves_no_blob_file(self):
+        self.db.add_image_record(b"kept", b"thumb", "PNG", 1, 1, "kept").result(5)
+        original = ck.SQL_INSERT_IMAGE
+        ck.SQL_INSERT_IMAGE = "INSERT INTO missing_table VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        try:
+            with self.assertRaises(sqlite3.Error):
+                self.db.add_image_record(b"lost", b"thumb", "PNG", 1, 1, "lost").result(5)
+        finally:
+            ck.SQL_INSERT_IMAGE = original
+        self.assertEqual(self.blob_files(), ["kept.png"])
+
+
+class MigrationTest(unittest.TestCase):
+    """Upgrading a pre-versioning database whose hashes are MD5"""
+    LEGACY_SCHEMA = """
+        CREATE TABLE records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL,
+            content TEXT,
+            content_blob BLOB,
+            timestamp REAL NOT NULL,
+            thumbnail BLOB,
+            format TEXT,
+            width INTEGER,
+            height INTEGER,
+            content_hash TEXT
+        )
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "clipboard.db"
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(self.LEGACY_SCHEMA)
+        conn.execute("CREATE INDEX idx_hash ON records(content_hash)")
+        md5 = lambda data: hashlib.md5(data).hexdigest()
+        # (id, type, content, blob, timestamp, 旧版哈希)；旧版编辑文本时不更新哈希
+        self.legacy_rows = [
+            (1, "text", "alpha", None, 1.0, md5(b"alpha")),
+            (2, "text", "alpha", None, 2.0, md5(b"alpha")),  # 完全重复
+            (3, "text", "beta edited", None, 3.0, md5(b"beta")),  # 编辑过
+            (4, "text", "beta edited", None, 4.0, md5(b"beta edited")),  # 与编辑结果相同
+            (5, "text", "gamma edited", None, 5.0, md5(b"gamma")),  # 编辑过，无冲突
+            (6, "image", None, b"png-bytes", 6.0, md5(b"png-bytes")),
+        ]
+        conn.executemany(
+            "INSERT INTO records (id, type, content, content_blob, timestamp, format, content_hash) "
+            "VALUES (?, ?, ?, ?, ?, 'plain', ?)", self.legacy_rows)
+        conn.commit()
+        conn.close()
+        self.db = ck.ClipboardDatabase(self.db_path)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_newest_row_of_each_collision_survives(self):
+        rows = dict(self.db.conn.execute("SELECT id, content_hash FROM records").fetchall())
+        self.assertEqual(sorted(rows), [2, 4, 5, 6])
+        self.assertEqual(rows[2], ck.content_digest(b"alpha"))
+        self.assertEqual(rows[4], ck.content_digest(b"beta edited"))
+        self.assertEqual(rows[5], ck.content_digest(b"gamma edited"))
+        # 图片记录无法从编码字节重算像素哈希，保留旧值
+        self.assertEqual(rows[6], self.legacy_rows[5][5])
+        self.assertEqual(self.db.conn.execute("PRAGMA user_version").fetchone()[0], ck.SCHEMA_VERSION)
+
+    def test_recopying_legacy_text_hits_the_migrated_row(self):
+        row = self.db.add_text_record("alpha", "plain", ck.content_digest(b"alpha")).result(5)
+        self.assertEqual(row[0], 2)
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()